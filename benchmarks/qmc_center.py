@@ -0,0 +1,55 @@
+"""compares the error of the center estimate from pseudo random and randomised Halton (qmc) sampling
+
+the reference center comes from a long qmc run, each sample size is repeated with different seeds and the
+root mean square distance to the reference is reported, along with the time spent per run
+
+run from the repository root:  python benchmarks/qmc_center.py [--trials 20] [--reference 20000000]"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from locationcalc import ConstraintEngine, sampling_domain
+
+#three readings around one spot, the valid region is a lens shaped slab
+spheres = [[0, 0, 0, 250, 0], [300, 0, 0, 250, 0], [150, 200, 0, 250, 0]]
+sampleSizes = [1000, 10000, 100000, 1000000]
+
+def estimate(samples, qmc, rng, chunk=1000000):
+    #center of the valid points out of samples drawn from the sampling domain
+    sampler = sampling_domain(spheres, qmc=qmc)[2]
+    engine = ConstraintEngine(spheres, [])
+    total = np.zeros(3)
+    count = 0
+    for start in range(0, samples, chunk):
+        points = engine.filter(sampler(min(chunk, samples - start), rng))
+        total += points.sum(axis=0)
+        count += len(points)
+    return total / count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--reference", type=int, default=20000000)
+    args = parser.parse_args()
+
+    reference = estimate(args.reference, True, np.random.default_rng(0))
+    print("reference center:", np.round(reference, 3))
+    print("{:>9} {:>14} {:>14} {:>10} {:>10}".format("samples", "random error", "qmc error", "random s", "qmc s"))
+    for samples in sampleSizes:
+        row = [samples]
+        times = []
+        for qmc in (False, True):
+            errors = []
+            start = time.perf_counter()
+            for trial in range(args.trials):
+                center = estimate(samples, qmc, np.random.default_rng(trial + 1))
+                errors.append(np.sum((center - reference)**2))
+            times.append((time.perf_counter() - start) / args.trials)
+            row.append(np.sqrt(np.mean(errors)))
+        print("{:>9} {:>14.4f} {:>14.4f} {:>10.4f} {:>10.4f}".format(*row, *times))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""cold start time of the solver entry points
+
+each case runs in a fresh python process, so nothing is cached between runs, and the best of --repeats runs is kept.
+a headless solve should cost little more than importing numpy, and none of them should load plotly or pyperclip
+(they are only imported once something is plotted or pasted)
+
+run from the repository root:
+    python benchmarks/startup.py
+    python benchmarks/startup.py -o startup.json --repeats 20"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+#name: code run in the new process
+cases = {"python": "pass",
+         "numpy": "import numpy",
+         "locationcalc": "import locationcalc",
+         "main": "import main",
+         "headless solve": "import locationcalc; locationcalc.solve([[0, 0, 0, 250, 0], [300, 0, 0, 250, 0]], [], {'seed': 1})"}
+#modules that should never be loaded by the cases above
+lazyModules = ["plotly", "pyperclip"]
+
+def cold_start(code, repeats):
+    """returns [best seconds, modules of lazyModules that were loaded] for running code in a new python process"""
+    check = "; import sys; print(','.join(name for name in " + repr(lazyModules) + " if name in sys.modules))"
+    best = float("inf")
+    loaded = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", code + check], cwd=root, capture_output=True, text=True, check=True).stdout
+        best = min(best, time.perf_counter() - start)
+        loaded = [name for name in output.strip().splitlines()[-1].split(",") if name] if output.strip() else []
+    return [best, loaded]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="cold start time of the solver entry points")
+    parser.add_argument("-o", "--output", help="json file to write results to")
+    parser.add_argument("--repeats", type=int, default=10, help="runs of each case, the fastest is kept (default 10)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, code in cases.items():
+        [seconds, loaded] = cold_start(code, args.repeats)
+        results[name] = {"seconds": seconds, "lazyLoaded": loaded}
+        print(f"{name:>15}: {seconds*1000:7.1f} ms" + ("  loaded " + ", ".join(loaded) if loaded else ""))
+    overhead = results["headless solve"]["seconds"] - results["numpy"]["seconds"]
+    print(f"headless solve takes {overhead*1000:.1f} ms more than importing numpy")
+    if args.output:
+        with open(args.output, "w") as outputFile:
+            json.dump(results, outputFile, indent=1)
+    return 1 if any(result["lazyLoaded"] for result in results.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
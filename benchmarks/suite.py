@@ -0,0 +1,201 @@
+"""speed and accuracy suite for the solver hot paths
+
+every scenario is made from a fixed seed, so runs can be compared with each other. for each scenario the suite times
+sphere_scatter, cyl_scatter, valid_points, get_best_overlap and sphere_intersection, runs a full solve, and checks the
+center against a reference (exact where analytic.analytic_region has one, otherwise a long qmc run)
+
+run from the repository root:
+    python benchmarks/suite.py -o results.json                      write results
+    python benchmarks/suite.py -o new.json --baseline results.json  also compare against earlier results,
+                                                                    exits with 1 if anything got slower or less accurate"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import locationcalc as lc
+from locationcalc.analytic import analytic_region
+from locationcalc.solver import sampling_domain
+
+### SCENARIOS ###
+#each returns [spheres, voidSpheres] for a numpy random generator
+
+def two_sphere_lens(rng):
+    target = rng.uniform(-1000, 1000, 3)
+    spheres = []
+    for i in range(2):
+        direction = rng.normal(0, 1, 3)
+        direction /= np.linalg.norm(direction)
+        spheres.append((target + direction * rng.uniform(150, 240)).tolist() + [250, 0])
+    return [spheres, []]
+
+def thin_shell(rng):
+    #edge of a detection range (shell 5 thick) crossed with an ordinary reading
+    target = rng.uniform(-1000, 1000, 3)
+    shellCenter = target + [240, 0, 0]
+    return [[shellCenter.tolist() + [250, 245], (target + rng.uniform(-100, 100, 3)).tolist() + [250, 0]], []]
+
+def many_spheres(rng, count=10):
+    target = rng.uniform(-1000, 1000, 3)
+    spheres = []
+    for i in range(count):
+        direction = rng.normal(0, 1, 3)
+        direction /= np.linalg.norm(direction)
+        spheres.append((target + direction * rng.uniform(50, 240)).tolist() + [250, 0])
+    return [spheres, []]
+
+def void_split(rng):
+    #three spheres around a common axis meet in a spindle along it, a void at its middle leaves two separate pieces
+    center = rng.uniform(-1000, 1000, 3)
+    spheres = [(center + [230*np.cos(angle), 0, 230*np.sin(angle)]).tolist() + [250, 0] for angle in (0, 2*np.pi/3, 4*np.pi/3)]
+    return [spheres, [center.tolist() + [0, 40]]]
+
+def hundreds_of_spheres(rng):
+    return many_spheres(rng, 300)
+
+def vertical_lens(rng):
+    #pairs stacked straight up and straight down, lens and cylinder axes along +z and -z
+    target = rng.uniform(-1000, 1000, 3)
+    return [[(target + [0, 0, 200]).tolist() + [250, 0], (target - [0, 0, 200]).tolist() + [250, 0],
+             (target - [0, 0, 150]).tolist() + [250, 0]], []]
+
+scenarios = {"twoSphereLens": two_sphere_lens, "thinShell": thin_shell, "manySpheres": many_spheres,
+             "voidSplit": void_split, "hundredsOfSpheres": hundreds_of_spheres, "verticalLens": vertical_lens}
+#separate regions each scenario should find, 1 if not listed
+expectedRegions = {"voidSplit": 2}
+
+### MEASUREMENTS ###
+
+def timed(function, repeats=3):
+    #best of repeats, in seconds
+    best = np.inf
+    for i in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return [best, result]
+
+def reference(spheres, voidSpheres, samples):
+    """returns [center, exact] for the valid region, exact when there is a closed form"""
+    region = analytic_region(spheres, voidSpheres)
+    if region is not None and region["volume"] > 0:
+        return [region["center"], True]
+    sampler = sampling_domain(spheres, qmc=True)[2]
+    [points, stats, drawn] = lc.stream_scatter(lc.ConstraintEngine(spheres, voidSpheres), sampler, samples, np.random.default_rng(0), keepPoints=0)
+    return [stats.mean, False]
+
+def run_scenario(name, seed, samples, referenceSamples):
+    rng = np.random.default_rng(seed)
+    [spheres, voidSpheres] = scenarios[name](rng)
+    result = {"spheres": len(spheres), "voidSpheres": len(voidSpheres)}
+    smallest = min(spheres, key=lambda sphere: sphere[3])
+
+    [seconds, points] = timed(lambda: lc.sphere_scatter(smallest, samples, np.random.default_rng(1)))
+    result["sphereScatterPerSecond"] = samples / seconds
+    [seconds, cylinder] = timed(lambda: lc.cyl_scatter(2*smallest[3], smallest[3], [1, 1, 0], smallest[0:3], samples, np.random.default_rng(1)))
+    result["cylScatterPerSecond"] = samples / seconds
+    [seconds, valid] = timed(lambda: lc.valid_points(spheres, voidSpheres, points))
+    result["validPointsPerSecond"] = samples / seconds
+    result["sphereAcceptance"] = len(valid) / samples
+    [seconds, overlap] = timed(lambda: lc.get_best_overlap(spheres) if len(spheres) > 1 else [])
+    result["bestOverlapSeconds"] = seconds
+    with contextlib.redirect_stdout(io.StringIO()):
+        [seconds, scatter] = timed(lambda: lc.sphere_intersection(spheres, voidSpheres, np.random.default_rng(1), {"adaptive": False, "samples": samples}), 1)
+    result["sphereIntersectionSeconds"] = seconds
+
+    #full search as the interactive loop would run it, sampled even where there is a closed form
+    [seconds, solved] = timed(lambda: lc.solve(spheres, voidSpheres, {"seed": seed, "analytic": False}), 1)
+    [center, exact] = reference(spheres, voidSpheres, referenceSamples)
+    result["solveSeconds"] = seconds
+    result["drawn"] = solved["drawn"]
+    result["samplesPerSecond"] = solved["drawn"] / seconds
+    result["acceptance"] = solved["count"] / solved["drawn"] if solved["drawn"] > 0 else 0
+    result["regions"] = len(solved["regions"])
+    result["regionsOk"] = result["regions"] == expectedRegions.get(name, 1)
+    result["referenceExact"] = exact
+    result["centerError"] = float(np.linalg.norm(np.array(solved["center"]) - center)) if solved["feasible"] else None
+    #within 4 standard errors of the reference
+    result["centerOk"] = bool(solved["feasible"] and result["centerError"] <= 4 * np.linalg.norm(solved["standardError"]) + 1e-6)
+    return result
+
+def axis_checks(samples=1000):
+    """returns {name: True if ok} for samplers whose axis points straight along +z or -z (a degenerate case for the basis)"""
+    rng = np.random.default_rng(0)
+    checks = {}
+    for name, axis in [["+z", [0, 0, 1]], ["-z", [0, 0, -1]]]:
+        basis = lc.orthonormal_basis(axis)
+        checks["basis " + name] = bool(np.isfinite(basis).all() and np.allclose(basis @ basis.T, np.eye(3)))
+        lens = lc.lens_scatter([0, 0, 0, 250, 0], (300 * np.array(axis)).tolist() + [250, 0], samples, rng)
+        checks["lens " + name] = bool(np.isfinite(lens).all() and len(lc.valid_points([[0, 0, 0, 250, 0], (300 * np.array(axis)).tolist() + [250, 0]], [], lens)) == len(lens))
+        cylinder = lc.cyl_scatter(100, 50, axis, [0, 0, 0], samples, rng)
+        checks["cylinder " + name] = bool(np.isfinite(cylinder).all())
+    return checks
+
+### COMPARISON ###
+
+#keys where larger is better, every other timing is smaller is better
+higherIsBetter = {"sphereScatterPerSecond", "cylScatterPerSecond", "validPointsPerSecond", "samplesPerSecond"}
+lowerIsBetter = {"bestOverlapSeconds", "sphereIntersectionSeconds", "solveSeconds"}
+
+def compare(results, baseline, tolerance):
+    """returns a list of regression messages, speeds may be off by tolerance (a fraction) before they count"""
+    problems = []
+    for name, result in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        for key in higherIsBetter:
+            if key in old and result[key] < old[key] * (1 - tolerance):
+                problems.append(f"{name} {key}: {result[key]:.4g} (was {old[key]:.4g})")
+        for key in lowerIsBetter:
+            if key in old and result[key] > old[key] * (1 + tolerance):
+                problems.append(f"{name} {key}: {result[key]:.4g} (was {old[key]:.4g})")
+        if old.get("centerOk") and not result["centerOk"]:
+            problems.append(f"{name} center now off by {result['centerError']:.4g} (was {old['centerError']:.4g})")
+        if old.get("regions") != result["regions"]:
+            problems.append(f"{name} regions: {result['regions']} (was {old.get('regions')})")
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="speed and accuracy suite for the solver hot paths")
+    parser.add_argument("-o", "--output", help="json file to write results to")
+    parser.add_argument("--baseline", help="json results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="fraction a speed may get worse by before it is a regression (default 0.25)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--samples", type=int, default=200000, help="samples for the per function timings")
+    parser.add_argument("--reference-samples", type=int, default=4000000, help="qmc samples for reference centers without a closed form")
+    parser.add_argument("--scenario", action="append", choices=sorted(scenarios), help="only run these scenarios, can be repeated")
+    args = parser.parse_args(argv)
+
+    results = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(), "numpy": np.__version__,
+               "machine": platform.machine(), "seed": args.seed, "samples": args.samples, "scenarios": {}}
+    results["axisChecks"] = axis_checks()
+    for name, ok in results["axisChecks"].items():
+        if not ok:
+            print(f"{name:>18}: WRONG")
+    for name in args.scenario or scenarios:
+        result = run_scenario(name, args.seed, args.samples, args.reference_samples)
+        results["scenarios"][name] = result
+        print(f"{name:>18}: solve {result['solveSeconds']:.3f}s  {result['samplesPerSecond']:.3g} samples/s  "
+              f"acceptance {result['acceptance']:.3f}  center error {result['centerError']:.3g} {'ok' if result['centerOk'] else 'OFF'}  "
+              f"regions {result['regions']} {'ok' if result['regionsOk'] else 'WRONG'}")
+    if args.output:
+        with open(args.output, "w") as outputFile:
+            json.dump(results, outputFile, indent=1)
+    failed = not all(result["centerOk"] and result["regionsOk"] for result in results["scenarios"].values()) or not all(results["axisChecks"].values())
+    if args.baseline:
+        with open(args.baseline) as baselineFile:
+            problems = compare(results, json.load(baselineFile), args.tolerance)
+        for problem in problems:
+            print("regression:", problem)
+        failed = failed or len(problems) > 0
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
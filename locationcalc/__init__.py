@@ -0,0 +1,14 @@
+from .constraints import ConstraintEngine, get_best_overlap, prune_constraints, update_list, valid_points
+from .constraintset import ConstraintSet
+from .geometry import box_volume, cyl_volume, intersection_box, orthonormal_basis, sphere_volume, vector, vector_magnitude
+from .octree import octree_region, octree_sampler
+from .pairs import PairIndex
+from .pool import SamplePool, shared_pool
+from .profiling import Profiler, profiled
+from .qmc import halton, scrambled_halton
+from .regions import find_regions
+from .sampling import box_scatter, cyl_scatter, lens_scatter, lens_volume, sphere_scatter
+from .session import SessionStore
+from .solver import SearchState, adaptive_scatter, sampling_domain, solve, sphere_intersection
+from .stats import Reservoir, RunningStats, chi2_quantile, find_scatter_bounds, scatter_center, scatter_summary
+from .stream import stream_scatter
@@ -0,0 +1,115 @@
+import math
+import numpy as np
+
+from .profiling import timed_stage
+
+def _cap(radius, height):
+    #volume of a spherical cap, and the distance of its centroid from the sphere center
+    volume = math.pi * height**2 * (3*radius - height) / 3
+    offset = 3 * (2*radius - height)**2 / (4 * (3*radius - height))
+    return [volume, offset]
+
+def ball_intersection(centerA, radiusA, centerB, radiusB):
+    """volume and centroid of the intersection of two solid balls, from the two spherical caps either side of
+    the plane the sphere surfaces meet on
+    returns [volume, centroid] where centroid is an array [x, y, z], or None if the balls do not overlap"""
+    centerA = np.asarray(centerA, dtype=float)
+    centerB = np.asarray(centerB, dtype=float)
+    distance = float(np.linalg.norm(centerB - centerA))
+    if distance >= radiusA + radiusB:
+        return [0., None]
+    if distance + radiusB <= radiusA:
+        return [4/3 * math.pi * radiusB**3, centerB]
+    if distance + radiusA <= radiusB:
+        return [4/3 * math.pi * radiusA**3, centerA]
+    axis = (centerB - centerA) / distance
+    #distance from centerA to the plane of the circle the surfaces meet on
+    plane = (distance**2 + radiusA**2 - radiusB**2) / (2*distance)
+    [volumeA, offsetA] = _cap(radiusA, radiusA - plane)
+    [volumeB, offsetB] = _cap(radiusB, radiusB - (distance - plane))
+    volume = volumeA + volumeB
+    centroid = (volumeA * (centerA + offsetA*axis) + volumeB * (centerB - offsetB*axis)) / volume
+    return [volume, centroid]
+
+def ball_intersection_box(centerA, radiusA, centerB, radiusB):
+    """exact axis aligned bounding box of the intersection of two overlapping balls
+    along each axis direction the furthest point is the furthest point of one ball if it lies in the other,
+    otherwise it is on the circle the surfaces meet on
+    returns box = [[xmin, ymin, zmin], [xmax, ymax, zmax]] as an array"""
+    centerA = np.asarray(centerA, dtype=float)
+    centerB = np.asarray(centerB, dtype=float)
+    distance = float(np.linalg.norm(centerB - centerA))
+    if distance + radiusB <= radiusA:
+        return np.array([centerB - radiusB, centerB + radiusB])
+    if distance + radiusA <= radiusB:
+        return np.array([centerA - radiusA, centerA + radiusA])
+    axis = (centerB - centerA) / distance
+    plane = (distance**2 + radiusA**2 - radiusB**2) / (2*distance)
+    rimCenter = centerA + plane*axis
+    rimRadius = math.sqrt(max(radiusA**2 - plane**2, 0))
+    box = np.empty((2, 3))
+    for side, sign in enumerate([-1, 1]):
+        for i in range(3):
+            direction = np.zeros(3)
+            direction[i] = sign
+            if np.linalg.norm(centerA + radiusA*direction - centerB) <= radiusB:
+                reach = centerA[i] + sign*radiusA
+            elif np.linalg.norm(centerB + radiusB*direction - centerA) <= radiusA:
+                reach = centerB[i] + sign*radiusB
+            else:
+                reach = rimCenter[i] + sign*rimRadius*math.sqrt(max(1 - axis[i]**2, 0))
+            box[side, i] = reach
+    return box
+
+@timed_stage("analytic")
+def analytic_region(spheres, voidSpheres):
+    """exact volume, center and bounding box of the valid region when it has a closed form:
+    one sphere, or the lens of two spheres, with holes and voids cut out of it as long as
+    - the holes and voids do not overlap each other
+    - with two spheres, each hole or void is inside one sphere or misses one sphere entirely, so the part it
+      cuts from the lens is itself the intersection of two balls
+    the box is the box of the sphere or lens before holes and voids are cut out, so it can be larger than the region
+    returns {"center": [x, y, z], "volume": v, "box": box} (center and box None if nothing is left),
+    or None if the region has no closed form and has to be sampled"""
+    if len(spheres) == 0 or len(spheres) > 2:
+        return None
+    balls = [(np.asarray(sphere[0:3], dtype=float), float(sphere[3])) for sphere in spheres]
+    cuts = [(np.asarray(sphere[0:3], dtype=float), float(sphere[4])) for sphere in list(spheres) + list(voidSpheres) if sphere[4] > 0]
+    for i in range(len(cuts)):
+        for j in range(i):
+            if np.linalg.norm(cuts[i][0] - cuts[j][0]) < cuts[i][1] + cuts[j][1]:
+                return None
+
+    if len(balls) == 1:
+        [center, radius] = balls[0]
+        [volume, moment] = [4/3 * math.pi * radius**3, 4/3 * math.pi * radius**3 * center]
+        box = np.array([center - radius, center + radius])
+    else:
+        [volume, centroid] = ball_intersection(*balls[0], *balls[1])
+        if volume == 0:
+            return {"center": None, "volume": 0., "box": None}
+        moment = volume * centroid
+        box = ball_intersection_box(*balls[0], *balls[1])
+
+    for cutCenter, cutRadius in cuts:
+        if len(balls) == 1:
+            cut = ball_intersection(*balls[0], cutCenter, cutRadius)
+        else:
+            inside = [np.linalg.norm(cutCenter - center) + cutRadius <= radius for center, radius in balls]
+            missed = [np.linalg.norm(cutCenter - center) >= cutRadius + radius for center, radius in balls]
+            if any(missed):
+                continue
+            if inside[0]:
+                cut = ball_intersection(*balls[1], cutCenter, cutRadius)
+            elif inside[1]:
+                cut = ball_intersection(*balls[0], cutCenter, cutRadius)
+            else:
+                return None
+        if cut[0] > 0:
+            volume -= cut[0]
+            moment = moment - cut[0] * cut[1]
+
+    #relative tolerance, a void covering the whole region leaves only rounding error
+    if volume <= 1e-9 * float(np.prod(box[1] - box[0])):
+        return {"center": None, "volume": 0., "box": None}
+    return {"center": moment / volume, "volume": volume, "box": box}
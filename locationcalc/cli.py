@@ -0,0 +1,78 @@
+import argparse
+import contextlib
+import csv
+import json
+import sys
+
+from .parallel import solve_many
+from .profiling import Profiler, profiled
+
+def read_problems(inputFile, fileFormat):
+    """reads search problems from an open file
+    jsonl: one problem per line, {"id": ..., "spheres": [[x, y, z, r1, r2], ...], "voidSpheres": [...], "options": {...}}
+           voidSpheres and options are optional, void spheres can also be listed in spheres
+    csv: header id,x,y,z,r1,r2 with one sphere per row, rows with the same id make up one problem, r2 can be left out
+    returns list of problems as dicts in the jsonl form"""
+    problems = []
+    if fileFormat == "csv":
+        byId = {}
+        for row in csv.DictReader(inputFile):
+            sphere = [float(row["x"]), float(row["y"]), float(row["z"]), float(row["r1"]), float(row.get("r2") or 0)]
+            if row["id"] not in byId:
+                byId[row["id"]] = {"id": row["id"], "spheres": []}
+                problems.append(byId[row["id"]])
+            byId[row["id"]]["spheres"].append(sphere)
+    else:
+        for lineNumber, line in enumerate(inputFile, 1):
+            if line.strip() == "":
+                continue
+            problem = json.loads(line)
+            problem.setdefault("id", lineNumber)
+            problems.append(problem)
+    return problems
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m locationcalc", description="Solve many recorded searches without user input, writing one JSON result per line.")
+    parser.add_argument("input", help="jsonl or csv file of search problems, - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="file to write jsonl results to, - for stdout (default)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="input format, guessed from the file extension if not given")
+    parser.add_argument("--seed", type=int, help="random seed used for every search")
+    parser.add_argument("--workers", type=int, default=1, help="number of searches solved at once in separate processes (default 1)")
+    parser.add_argument("--option", action="append", default=[], metavar="NAME=VALUE",
+                        help="any config setting, VALUE is read as json (e.g. --option adaptiveTolerance=0.1), can be repeated")
+    parser.add_argument("--profile", metavar="FILE", help="write the time spent in each solver stage and the point counts to FILE as json, "
+                        "only searches run in this process are counted so use it with --workers 1")
+    parser.add_argument("--cprofile", metavar="FILE", help="write cProfile data for the whole run to FILE (open with pstats or snakeviz)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {}
+    for option in args.option:
+        [name, value] = option.split("=", 1)
+        try:
+            options[name] = json.loads(value)
+        except ValueError:
+            options[name] = value
+    if args.seed is not None:
+        options["seed"] = args.seed
+    fileFormat = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+
+    inputFile = sys.stdin if args.input == "-" else open(args.input, newline="")
+    with inputFile:
+        problems = read_problems(inputFile, fileFormat)
+    profiler = Profiler(args.cprofile is not None) if args.profile or args.cprofile else None
+    outputFile = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        with profiled(profiler) if profiler is not None else contextlib.nullcontext():
+            for result in solve_many(problems, options, args.workers):
+                outputFile.write(json.dumps(result) + "\n")
+                outputFile.flush()
+    finally:
+        if outputFile is not sys.stdout:
+            outputFile.close()
+    if args.profile:
+        profiler.write_json(args.profile)
+    if args.cprofile:
+        profiler.write_cprofile(args.cprofile)
+    return 0
@@ -0,0 +1,79 @@
+#default solver settings
+#any of these can be changed here for every search, or passed per search as an options dict, see options()
+
+samples = 200000
+
+#adaptive sampling, draws batches until the center is known to within adaptiveTolerance (standard error per axis)
+adaptive = True
+adaptiveTolerance = 0.5
+adaptiveBatch = 50000
+adaptiveMaxSamples = 5000000
+adaptiveMaxTime = 10
+minAdaptivePoints = 100
+
+#one sphere, or two spheres with voids that only cut one of them, are solved exactly (see analytic.py) without sampling
+analytic = True
+
+#"sample" generates points in the smallest sampling domain, "octree" generates them in the octree cells of the valid region
+#(the octree is also used whenever sampling finds no points)
+solverEngine = "sample"
+octreeDepth = 8
+octreeMaxCells = 1000000
+
+#separate regions holding less than this fraction of the valid points are not reported
+minRegionMass = 0.01
+
+#generate points from randomised Halton sequences instead of pseudo random numbers, they cover the sampled region more
+#evenly so the center settles with fewer samples. the usual standard error would not show this, so with adaptive set each
+#batch is drawn as qmcReplicates separately randomised sets and the standard error comes from how much their centers differ
+qmc = False
+qmcReplicates = 8
+
+#reuse cached blocks of unit ball, shell and cylinder samples instead of drawing new ones for every batch, see pool.py
+#blocks hold samplePoolSize points, at most samplePoolBlocks are kept, samplePoolSequence is "random" or "halton"
+samplePool = False
+samplePoolSize = 1000000
+samplePoolBlocks = 8
+samplePoolSequence = "random"
+
+#uncertain sphere edges, see likelihood.py. with edgeSigma above 0 every radius is taken as a reading with a gaussian error
+#of edgeSigma: points are generated in the spheres widened by edgeWidth * edgeSigma on each edge and weighted by how likely
+#every reading makes them. the result is the likelihood weighted center, the most likely point and the credible region
+#holding credibility of the weight. more points are generated until there are minEffectiveSamples effective samples
+#(or adaptiveMaxSamples have been drawn for the spheres just added)
+edgeSigma = 0
+edgeWidth = 3
+credibility = 0.95
+minEffectiveSamples = 2000
+
+#kept points are only topped up with new samples when fewer than this survive a new sphere
+minSurvivors = 20000
+
+#processes used by solve, above 1 the samples budget is split into chunks of parallelChunk samples shared between them
+#(chunks get their own random streams, so results only depend on seed and not on the number of workers)
+workers = 1
+parallelChunk = 250000
+
+#points are generated and filtered streamChunk at a time, only the running totals and a uniform sample of at most
+#maxKeptPoints valid points are kept, so memory does not grow with samples
+streamChunk = 100000
+maxKeptPoints = 1000000
+
+#saved sessions (see session.py), the least recently used are deleted once there are more than maxSessions
+#or they take more than maxSessionBytes
+sessionDir = "~/.locationcalc/sessions"
+maxSessions = 20
+maxSessionBytes = 2 * 1024**3
+
+#seed for the random number generator of a search, None picks a fresh one every time
+seed = None
+
+def options(overrides=None):
+    """returns a dict of every setting in this module, with overrides = {name: value} applied on top
+    raises ValueError for names that are not settings"""
+    settings = {name: value for name, value in globals().items() if not name.startswith('_') and not callable(value)}
+    for name, value in (overrides or {}).items():
+        if name not in settings:
+            raise ValueError("unknown option: " + str(name))
+        settings[name] = value
+    return settings
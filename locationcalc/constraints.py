@@ -0,0 +1,200 @@
+import math
+import numpy as np
+
+from .geometry import intersection_box, squared_distances, vector, vector_magnitude
+from .pairs import PairIndex
+from .profiling import count, enabled, timed_stage
+
+class ConstraintEngine:
+    """Holds the active spheres and void spheres as arrays so a whole block of points can be tested at once.
+    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ]
+    voidSpheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ]
+
+    all tests are done on squared distances, a point is valid when r2**2 <= d**2 <= r1**2 for every sphere
+    and d**2 >= r2**2 for every void sphere (same rules as valid_points)"""
+    def __init__(self, spheres, voidSpheres):
+        spheres = np.asarray(spheres, dtype=float).reshape(-1, 5)
+        voidSpheres = np.asarray(voidSpheres, dtype=float).reshape(-1, 5)
+        self.spheres = spheres
+        self.voidSpheres = voidSpheres
+        self.centers = spheres[:, 0:3]
+        self.outerSq = spheres[:, 3]**2
+        self.innerSq = spheres[:, 4]**2
+        self.voidCenters = voidSpheres[:, 0:3]
+        self.voidSq = voidSpheres[:, 4]**2
+
+    def mask(self, points):
+        """returns a boolean array, True for each point of points (shape (n, 3)) that satisfies every constraint"""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        if enabled():
+            return self._counted_mask(points)
+        keep = np.ones(len(points), dtype=bool)
+        for center, outerSq, innerSq in zip(self.centers, self.outerSq, self.innerSq):
+            distSq = squared_distances(points, center)
+            keep &= distSq <= outerSq
+            if innerSq > 0:
+                keep &= distSq >= innerSq
+        for center, voidSq in zip(self.voidCenters, self.voidSq):
+            keep &= squared_distances(points, center) >= voidSq
+        return keep
+
+    def _counted_mask(self, points):
+        #mask, also counting for the profiler how many points each constraint rejects that earlier ones let through
+        keep = np.ones(len(points), dtype=bool)
+        kept = len(points)
+        constraints = [["sphere", sphere, True] for sphere in self.spheres] + [["void", sphere, False] for sphere in self.voidSpheres]
+        for kind, sphere, isSphere in constraints:
+            distSq = squared_distances(points, sphere[0:3])
+            if isSphere:
+                keep &= distSq <= sphere[3]**2
+                if sphere[4] > 0:
+                    keep &= distSq >= sphere[4]**2
+            else:
+                keep &= distSq >= sphere[4]**2
+            now = int(np.count_nonzero(keep))
+            count("rejected by " + kind + " " + str(sphere.tolist()), kept - now)
+            kept = now
+        return keep
+
+    def filter(self, points):
+        """returns only the points (shape (n, 3)) that satisfy every constraint"""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        return points[self.mask(points)]
+
+def valid_points(spheres, voidSpheres, scatterSamples):
+    """Checks a list of 3D points against a list of spheres.
+    Points are considered valid when contained within all spheres in sphere list and not contained within the inner radius of any spheres within the list.
+
+    scatterSamples = [[x, y, z], [x, y, z],  ... ]
+    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ]
+    where r1 is outer radius of the sphere and r2 is the inner radius of the sphere
+
+    setting r2 to zero creates a non-hollow sphere
+    r2>r1 creates a 'void sphere' where contained points are invalid
+    
+    returns validPoints = array of shape (n, 3)"""
+    return ConstraintEngine(spheres, voidSpheres).filter(scatterSamples)
+
+def _shell_implied(sphere, by):
+    #True for each pair where the shell of by is inside the shell of sphere, so sphere rules out nothing more
+    #sphere and by are arrays of spheres (shape (n, 5)) or single spheres
+    distance = np.sqrt(((sphere[..., 0:3] - by[..., 0:3])**2).sum(axis=-1))
+    return (distance + by[..., 3] <= sphere[..., 3]) & ((sphere[..., 4] <= 0) | (distance + sphere[..., 4] <= by[..., 4]))
+
+def _void_implied(sphere, by):
+    #True for each pair where the void of sphere is inside the void of by
+    distance = np.sqrt(((sphere[..., 0:3] - by[..., 0:3])**2).sum(axis=-1))
+    return distance + sphere[..., 4] <= by[..., 4]
+
+def update_list(spheres, voidSpheres, removedSpheres, newSphere, constraints=None):
+    """sorts newly created sphere into appropriate list
+    spheres which have outer radius less than or equal to inner radius are considered void spheres
+    a sphere that only allows points which another sphere already rules out adds nothing, so it goes in removedSpheres:
+    a new sphere whose shell contains the shell of a sphere in the list is removed straight away, and spheres in the list
+    whose shell contains the new one are moved to removedSpheres. the same is done for voids inside a larger void
+    constraints is an optional ConstraintSet holding the same spheres and voids, its arrays are used instead of converting
+    the lists and it is kept up to date with them
+    returns [spheres, voidSpheres, removedSpheres]"""
+    if newSphere[3] <= newSphere[4]:
+        [sameList, implied] = [voidSpheres, _void_implied]
+        others = None if constraints is None else constraints.voidSpheres
+    else:
+        [sameList, implied] = [spheres, _shell_implied]
+        others = None if constraints is None else constraints.spheres
+    if len(sameList) > 0:
+        if others is None:
+            others = np.asarray(sameList, dtype=float).reshape(-1, 5)
+        new = np.asarray(newSphere, dtype=float)
+        if implied(new, others).any():
+            removedSpheres.append(newSphere)
+            return [spheres, voidSpheres, removedSpheres]
+        dropped = implied(others, new)
+        for sphere in [sphere for sphere, drop in zip(sameList, dropped) if drop]:
+            removedSpheres.append(sphere)
+            if constraints is not None:
+                constraints.remove(sphere)
+        sameList[:] = [sphere for sphere, drop in zip(sameList, dropped) if not drop]
+    sameList.append(newSphere)
+    if constraints is not None:
+        constraints.add(newSphere)
+    return [spheres, voidSpheres, removedSpheres]
+
+@timed_stage("pruning")
+def prune_constraints(spheres, voidSpheres, removedSpheres, constraints=None):
+    """checks a sorted sphere list as a whole, after update_list has removed the spheres that contain each other
+    stops early if two spheres cannot overlap (too far apart, or one inside the hollow of the other), if the bounding box
+    of the intersection is empty, or if a void covers the whole box
+    void spheres that do not reach the box cannot remove any point and are moved to removedSpheres
+    returns [spheres, voidSpheres, removedSpheres, box]
+    where box = [[xmin, ymin, zmin], [xmax, ymax, zmax]] bounds every valid point,
+    or None if there are no spheres or no point can satisfy every sphere
+    constraints is an optional ConstraintSet holding the same spheres and voids (see update_list), the voids moved out
+    are removed from it too and box is kept as its cached box"""
+    if len(spheres) == 0:
+        return [spheres, voidSpheres, removedSpheres, None]
+    active = np.asarray(spheres, dtype=float).reshape(-1, 5) if constraints is None else constraints.spheres
+    distance = np.sqrt(((active[:, np.newaxis, 0:3] - active[np.newaxis, :, 0:3])**2).sum(axis=2))
+    outer = active[:, 3]
+    inner = active[:, 4]
+    apart = distance >= outer[:, np.newaxis] + outer[np.newaxis, :]
+    #sphere j entirely inside the hollow of sphere i
+    hollow = distance + outer[np.newaxis, :] <= inner[:, np.newaxis]
+    if (apart | hollow).any():
+        return _pruned(spheres, voidSpheres, removedSpheres, None, constraints)
+    box = intersection_box(active)
+    if box is None or len(voidSpheres) == 0:
+        return _pruned(spheres, voidSpheres, removedSpheres, box, constraints)
+
+    voids = np.asarray(voidSpheres, dtype=float).reshape(-1, 5) if constraints is None else constraints.voidSpheres
+    centers = voids[:, 0:3]
+    voidSq = voids[:, 4]**2
+    nearestSq = ((np.maximum(box[0] - centers, 0) + np.maximum(centers - box[1], 0))**2).sum(axis=1)
+    farthestSq = (np.maximum(np.abs(centers - box[0]), np.abs(centers - box[1]))**2).sum(axis=1)
+    if (farthestSq < voidSq).any():
+        return _pruned(spheres, voidSpheres, removedSpheres, None, constraints)
+    reaches = nearestSq < voidSq
+    for sphere in [sphere for sphere, keep in zip(voidSpheres, reaches) if not keep]:
+        removedSpheres.append(sphere)
+        if constraints is not None:
+            constraints.remove(sphere)
+    voidSpheres[:] = [sphere for sphere, keep in zip(voidSpheres, reaches) if keep]
+    return _pruned(spheres, voidSpheres, removedSpheres, box, constraints)
+
+def _pruned(spheres, voidSpheres, removedSpheres, box, constraints):
+    #result of prune_constraints, box is handed to the ConstraintSet so it is not worked out again
+    if constraints is not None:
+        constraints.set_box(box)
+    return [spheres, voidSpheres, removedSpheres, box]
+
+@timed_stage("pairs")
+def get_best_overlap(spheres, pairIndex=None):
+    """calculates and returns the pair of spheres from a sphere list which have the smallest positive overlapping distance
+    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ]
+    pairIndex is a PairIndex already holding spheres, one is built if not given (see pairs.py)
+    returns [[sphereOne, sphereTwo], overlap, intersectionRadius, v_u, center]
+    where sphereOne, sphereTwo are spheres = [x, y, z, r1, r2]
+    and overlap is the overlapping distance
+    if no valid overlap is found, returns [] (counted as "no overlapping pair" by the profiler, see profiling.py)"""
+    #could implement cylinder area calculation to more accurately find the smallest overlap
+    if pairIndex is None:
+        pairIndex = PairIndex(spheres)
+    bestOverlap = pairIndex.best_pair()
+    if len(bestOverlap) != 0:
+        [sphereOne, sphereTwo] = bestOverlap[0]
+        v_u = vector(sphereOne, sphereTwo)
+        distance = vector_magnitude(v_u)
+        v_u = [x / distance for x in v_u]
+        distCenter = (distance**2 + sphereOne[3]**2 - (sphereTwo[3]**2)) / (2*distance)
+        if abs(distCenter) < sphereOne[3]:
+            vCenter = [x * distCenter for x in v_u]
+            centerPoint = [sphereOne[0] + vCenter[0], sphereOne[1] + vCenter[1], sphereOne[2] + vCenter[2]]
+            intersectionRadius = math.sqrt(sphereOne[3]**2 - distCenter**2)
+        else:
+            #one sphere is inside the other so the surfaces never meet, the overlap is all of the smaller sphere
+            smaller = sphereOne if sphereOne[3] <= sphereTwo[3] else sphereTwo
+            centerPoint = list(smaller[0:3])
+            intersectionRadius = smaller[3]
+        bestOverlap.extend([intersectionRadius, v_u, centerPoint])
+    else:
+        count("no overlapping pair")
+    return bestOverlap
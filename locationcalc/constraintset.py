@@ -0,0 +1,136 @@
+import math
+import numpy as np
+
+from .constraints import ConstraintEngine
+from .geometry import intersection_box
+
+#one row per sphere, kind is sphereKind or voidKind
+sphereDtype = np.dtype([("center", float, 3), ("r1", float), ("r2", float), ("outerSq", float), ("innerSq", float), ("kind", np.int8)])
+sphereKind = 0
+voidKind = 1
+
+class ConstraintSet:
+    """keeps the active spheres and void spheres of a search in one structured numpy array (see sphereDtype)
+    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ]
+    a sphere with r1 <= r2 is a void sphere, same rule as update_list
+
+    rows are added at the end of an array that grows by doubling and removed by marking them dead, the dead rows are
+    cleared out once they make up half the array, so adding and removing are O(1) on average and the order spheres were
+    added in is kept. everything worked out from the rows (the (n, 5) sphere and void arrays, sphere volumes, the
+    intersection box and the ConstraintEngine) is cached until the set next changes"""
+    def __init__(self, spheres=(), voidSpheres=()):
+        self.rows = np.zeros(8, dtype=sphereDtype)
+        self.alive = np.zeros(8, dtype=bool)
+        self.size = 0
+        self.dead = 0
+        #spheres (not voids) removed so far, lets a PairIndex built on the spheres tell when it has to start over
+        self.sphereRemovals = 0
+        #sphere as a tuple: row it is in
+        self.index = {}
+        self.cache = {}
+        for sphere in list(spheres) + list(voidSpheres):
+            self.add(sphere)
+
+    def __len__(self):
+        return self.size - self.dead
+
+    def __contains__(self, sphere):
+        return tuple(map(float, sphere)) in self.index
+
+    def add(self, sphere):
+        """adds sphere = [x, y, z, r1, r2], does nothing if it is already in the set
+        returns True if it was added"""
+        key = tuple(map(float, sphere))
+        if len(key) != 5:
+            raise ValueError("spheres need 5 numbers [x, y, z, r1, r2], got " + str(sphere))
+        if key in self.index:
+            return False
+        if self.size == len(self.rows):
+            self.rows = np.concatenate([self.rows, np.zeros(len(self.rows), dtype=sphereDtype)])
+            self.alive = np.concatenate([self.alive, np.zeros(len(self.alive), dtype=bool)])
+        row = self.rows[self.size]
+        row["center"] = key[0:3]
+        [row["r1"], row["r2"]] = key[3:5]
+        [row["outerSq"], row["innerSq"]] = [key[3]**2, key[4]**2]
+        row["kind"] = voidKind if key[3] <= key[4] else sphereKind
+        self.alive[self.size] = True
+        self.index[key] = self.size
+        self.size += 1
+        self.cache = {}
+        return True
+
+    def remove(self, sphere):
+        """removes sphere = [x, y, z, r1, r2] from the set
+        raises KeyError if it is not in the set"""
+        i = self.index.pop(tuple(map(float, sphere)))
+        self.alive[i] = False
+        self.dead += 1
+        if self.rows[i]["kind"] == sphereKind:
+            self.sphereRemovals += 1
+        self.cache = {}
+        if self.dead > self.size // 2:
+            self._compact()
+
+    def _compact(self):
+        live = np.flatnonzero(self.alive[:self.size])
+        count = len(live)
+        self.rows[:count] = self.rows[live]
+        self.alive[:count] = True
+        self.alive[count:] = False
+        self.size = count
+        self.dead = 0
+        self.index = {key: position for position, key in enumerate(sorted(self.index, key=self.index.get))}
+
+    def _cached(self, name, function):
+        if name not in self.cache:
+            self.cache[name] = function()
+        return self.cache[name]
+
+    def _kind(self, kind):
+        rows = self.rows[:self.size][self.alive[:self.size]]
+        rows = rows[rows["kind"] == kind]
+        array = np.empty((len(rows), 5))
+        array[:, 0:3] = rows["center"]
+        array[:, 3] = rows["r1"]
+        array[:, 4] = rows["r2"]
+        return array
+
+    @property
+    def spheres(self):
+        """active spheres as a contiguous array of shape (n, 5), in the order they were added"""
+        return self._cached("spheres", lambda: self._kind(sphereKind))
+
+    @property
+    def voidSpheres(self):
+        """void spheres as a contiguous array of shape (n, 5), in the order they were added"""
+        return self._cached("voidSpheres", lambda: self._kind(voidKind))
+
+    @property
+    def volumes(self):
+        """volume of each of the spheres (hollow part taken out)"""
+        return self._cached("volumes", lambda: (4/3)*math.pi*(self.spheres[:, 3]**3 - self.spheres[:, 4]**3))
+
+    def smallest(self):
+        """returns [sphere, volume] for the sphere with the least volume, or [] if there are no spheres"""
+        if len(self.spheres) == 0:
+            return []
+        i = int(np.argmin(self.volumes))
+        return [self.spheres[i].tolist(), float(self.volumes[i])]
+
+    @property
+    def box(self):
+        """bounding box of the intersection of the spheres, see geometry.intersection_box (None if they cannot all overlap)"""
+        return self._cached("box", lambda: intersection_box(self.spheres) if len(self.spheres) > 0 else None)
+
+    def set_box(self, box):
+        """keeps box as the intersection box of the set until it next changes, for a box already worked out
+        (prune_constraints hands over the one it finds, None when no point can satisfy every sphere)"""
+        self.cache["box"] = box
+
+    def engine(self):
+        """returns a ConstraintEngine for the set, built on the cached arrays"""
+        return self._cached("engine", lambda: ConstraintEngine(self.spheres, self.voidSpheres))
+
+    def to_lists(self):
+        """returns [spheres, voidSpheres] as lists of [x, y, z, r1, r2]"""
+        return [self.spheres.tolist(), self.voidSpheres.tolist()]
@@ -0,0 +1,93 @@
+import functools
+import math
+import numpy as np
+
+def vector(pointOne, pointTwo):
+    """Calculates and returns the vector from pointOne to pointTwo"""
+    v = [pointTwo[0] - pointOne[0], pointTwo[1] - pointOne[1], pointTwo[2] - pointOne[2]]
+    return v
+
+def vector_magnitude(v):
+    """Calculates and returns the magnitude of a vector v"""
+    mag = math.sqrt(v[0]**2 + v[1]**2 + v[2]**2)
+    return mag
+
+def sphere_volume(sphere):
+    """Calculates and returns the volume of a sphere or hollow sphere
+    sphere = [x, y, z, rad1, rad2]"""
+    [rad1, rad2] = [sphere[3], sphere[4]]
+    vol = (4/3)*math.pi*(rad1**3 - rad2**3)
+    return vol
+
+def cyl_volume(d1, r):
+    """Calculates and returns the volume of a cylinder of height d1, radius r
+    returns volume"""
+    return math.pi*(r**2)*d1
+
+def box_volume(box):
+    """Calculates and returns the volume of an axis aligned box
+    box = [[xmin, ymin, zmin], [xmax, ymax, zmax]]"""
+    return float(np.prod(np.subtract(box[1], box[0])))
+
+def intersection_box(spheres, iterations=50, tolerance=1e-6):
+    """Calculates a tight axis aligned bounding box of the intersection of the outer radii of a sphere list
+    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ]
+
+    starts from the overlap of the bounding boxes of every sphere and then narrows each axis against every sphere:
+    the box can only reach as far along an axis as a sphere allows at the closest point of the box in the other two axes.
+    repeated until the box stops shrinking (by less than tolerance) or after iterations passes
+    returns box = [[xmin, ymin, zmin], [xmax, ymax, zmax]] as an array, or None if the spheres cannot all overlap"""
+    spheres = np.asarray(spheres, dtype=float).reshape(-1, 5)
+    centers = spheres[:, 0:3]
+    radii = spheres[:, 3]
+    low = (centers - radii[:, np.newaxis]).max(axis=0)
+    high = (centers + radii[:, np.newaxis]).min(axis=0)
+    if (low > high).any():
+        return None
+    for i in range(iterations):
+        change = 0
+        for axis in range(3):
+            others = [a for a in range(3) if a != axis]
+            #distance from each center to the box in the other two axes
+            gap = np.maximum(low[others] - centers[:, others], 0) + np.maximum(centers[:, others] - high[others], 0)
+            remaining = radii**2 - (gap**2).sum(axis=1)
+            if (remaining < 0).any():
+                return None
+            halfWidth = np.sqrt(remaining)
+            newLow = max(low[axis], (centers[:, axis] - halfWidth).max())
+            newHigh = min(high[axis], (centers[:, axis] + halfWidth).min())
+            if newLow > newHigh:
+                return None
+            change = max(change, newLow - low[axis], high[axis] - newHigh)
+            [low[axis], high[axis]] = [newLow, newHigh]
+        if change < tolerance:
+            break
+    return np.array([low, high])
+
+def squared_distances(points, center):
+    """returns the squared distance from center = [x, y, z] to every point of points (shape (n, 3))"""
+    diff = points - center
+    return np.einsum('ij,ij->i', diff, diff)
+
+@functools.lru_cache(maxsize=256)
+def _basis(vector):
+    vector = np.array(vector, dtype=float)
+    vector = vector / np.linalg.norm(vector)
+    #determine vector2 orthogonal to vector
+    #crossed with the axis vector has the smallest component along, which is never close to parallel (either way along it)
+    not_parallel = np.zeros(3)
+    not_parallel[np.argmin(np.abs(vector))] = 1
+    vector2 = np.cross(vector, not_parallel)
+    vector2 = vector2 / np.linalg.norm(vector2)
+
+    #determine vector3 orthogonal to both vector and vector2
+    #these 3 vectors form the basis of a new coordinate system
+    vector3 = np.cross(vector, vector2)
+    basis = np.array([vector, vector2, vector3])
+    basis.flags.writeable = False
+    return basis
+
+def orthonormal_basis(vector):
+    """returns a 3x3 array whose rows are vector (normalised) and two unit vectors orthogonal to it and each other
+    results are cached per vector so repeated calls for the same axis cost nothing"""
+    return _basis(tuple(float(x) for x in vector))
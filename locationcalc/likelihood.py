@@ -0,0 +1,122 @@
+import math
+import numpy as np
+
+from . import config
+from .geometry import squared_distances
+from .regions import find_regions
+from .stats import chi2_quantile
+
+#coefficients of the Chebyshev fit of erfc (Numerical Recipes erfcc), relative error below 1.2e-7 everywhere
+_erfcCoefficients = [0.17087277, -0.82215223, 1.48851587, -1.13520398, 0.27886807, -0.18628806, 0.09678418, 0.37409196, 1.00002368, -1.26551223]
+
+def _log_erfc(x):
+    #log(erfc(x)) for x >= 0, worked out in logs so it does not underflow far out in the tail
+    t = 1 / (1 + 0.5*x)
+    poly = np.zeros_like(x)
+    for coefficient in _erfcCoefficients:
+        poly = poly*t + coefficient
+    return np.log(t) - x*x + poly
+
+def log_normal_cdf(z):
+    """log of the standard normal cumulative distribution at each value of z (array)"""
+    z = np.asarray(z, dtype=float)
+    x = np.abs(z) / math.sqrt(2)
+    logTail = _log_erfc(x) - math.log(2)
+    #below the mean the cdf is the tail itself, above it is 1 - tail
+    return np.where(z < 0, logTail, np.log1p(-np.exp(logTail)))
+
+def widen(spheres, margin):
+    """returns the spheres grown by margin on each edge, outer radii out and inner radii in (not below 0)
+    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ], void spheres (r1 <= r2) only have their inner radius shrunk
+    void spheres shrunk to nothing are left out"""
+    widened = []
+    for sphere in spheres:
+        [x, y, z, r1, r2] = sphere
+        if r1 <= r2:
+            if r2 - margin > 0:
+                widened.append([x, y, z, r1, r2 - margin])
+        else:
+            widened.append([x, y, z, r1 + margin, max(r2 - margin, 0)])
+    return widened
+
+def log_likelihood(points, spheres, sigma):
+    """log likelihood of the object being at each point of points (shape (n, 3)) given every reading in spheres
+    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ] with void spheres (r1 <= r2) in the same list
+    each edge is taken as known to within a gaussian error of sigma: a point at distance d from a sphere is inside its
+    outer radius with chance Phi((r1 - d) / sigma) and outside its inner radius (hollow or void) with chance Phi((d - r2) / sigma)
+    returns array shape (n,), at most 0"""
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    logL = np.zeros(len(points))
+    for sphere in spheres:
+        distance = np.sqrt(squared_distances(points, np.asarray(sphere[0:3], dtype=float)))
+        if sphere[3] > sphere[4]:
+            logL += log_normal_cdf((sphere[3] - distance) / sigma)
+        if sphere[4] > 0:
+            logL += log_normal_cdf((distance - sphere[4]) / sigma)
+    return logL
+
+def effective_samples(weights):
+    """effective sample size (sum w)**2 / sum w**2 of a set of importance weights"""
+    weights = np.asarray(weights, dtype=float)
+    total = weights.sum()
+    return float(total**2 / (weights**2).sum()) if total > 0 else 0.
+
+def weighted_quantiles(points, weights, quantiles):
+    """returns the weighted quantiles (fractions) of points (shape (n, 3)) on each axis, array shape (len(quantiles), 3)"""
+    result = np.empty((len(quantiles), 3))
+    for axis in range(3):
+        order = np.argsort(points[:, axis])
+        cumulative = np.cumsum(weights[order])
+        ranks = np.searchsorted(cumulative, np.asarray(quantiles) * cumulative[-1])
+        result[:, axis] = points[order[np.minimum(ranks, len(order) - 1)], axis]
+    return result
+
+def likelihood_summary(points, logWeights, volume, drawn, credibility=None, minRegionMass=None):
+    """summarises importance weighted points in the same form as solver.summarise
+    points are uniform over the widened region (volume) and logWeights their log likelihood (see log_likelihood)
+    center, standardError, percentileBox, axes and ellipsoid are weighted, the standard error uses the effective sample size
+    also returns "map": the most likely point, "effectiveSamples", and the credible region, the most likely points holding
+    credibility of the total weight: "credibleBox", "credibleVolume" and "regions" (found in the credible points only)
+    box still bounds every point and volume is the widened region, "weighted": True"""
+    credibility = config.credibility if credibility is None else credibility
+    minRegionMass = config.minRegionMass if minRegionMass is None else minRegionMass
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    logWeights = np.asarray(logWeights, dtype=float)
+    if len(points) == 0:
+        return {"feasible": False, "center": None, "standardError": None, "box": None, "percentileBox": None, "axes": None,
+                "ellipsoid": None, "volume": float(volume), "count": 0, "drawn": int(drawn), "regions": [], "exact": False,
+                "weighted": True, "map": None, "effectiveSamples": 0., "credibleBox": None, "credibleVolume": 0.}
+    best = int(np.argmax(logWeights))
+    weights = np.exp(logWeights - logWeights[best])
+    total = weights.sum()
+    mean = weights @ points / total
+    centered = points - mean
+    #reliability weighted covariance, unbiased for the effective number of points
+    effective = effective_samples(weights)
+    covariance = (centered.T * weights) @ centered / total * (effective / max(effective - 1, 1))
+    [variances, vectors] = np.linalg.eigh(covariance)
+    order = np.argsort(variances)[::-1]
+    spread = np.sqrt(np.maximum(variances[order], 0))
+
+    #credible region, the fewest most likely points that hold credibility of the weight
+    ranked = np.argsort(weights)[::-1]
+    inside = ranked[:int(np.searchsorted(np.cumsum(weights[ranked]), credibility * total)) + 1]
+    credible = points[inside]
+    regions = [region for region in find_regions(credible, totalVolume=volume * len(inside) / len(points)) if region["mass"] >= minRegionMass]
+    return {"feasible": True,
+            "center": mean.tolist(),
+            "standardError": np.sqrt(np.diag(covariance) / effective).tolist(),
+            "box": [points.min(axis=0).tolist(), points.max(axis=0).tolist()],
+            "percentileBox": weighted_quantiles(points, weights, [0.05, 0.95]).tolist(),
+            "axes": vectors[:, order].T.tolist(),
+            "ellipsoid": (spread * math.sqrt(chi2_quantile(credibility))).tolist(),
+            "volume": float(volume),
+            "count": len(points),
+            "drawn": int(drawn),
+            "regions": regions,
+            "exact": False,
+            "weighted": True,
+            "map": points[best].tolist(),
+            "effectiveSamples": effective,
+            "credibleBox": [credible.min(axis=0).tolist(), credible.max(axis=0).tolist()],
+            "credibleVolume": float(volume * len(inside) / len(points))}
@@ -0,0 +1,101 @@
+import numpy as np
+
+from . import config
+from .constraints import ConstraintEngine
+from .geometry import intersection_box
+from .profiling import timed_stage
+
+_octants = np.array([[i, j, k] for i in (-1, 1) for j in (-1, 1) for k in (-1, 1)], dtype=float)
+
+def classify_cells(centers, half, spheres, voidSpheres):
+    """classifies axis aligned cells against every sphere and void sphere using the nearest and furthest point of each cell
+    centers = array shape (n, 3) of cell centers, half = [hx, hy, hz] half size of the cells
+    returns array of n ints: 0 cell is fully outside the valid region, 1 fully inside, 2 straddles the edge"""
+    inside = np.ones(len(centers), dtype=bool)
+    outside = np.zeros(len(centers), dtype=bool)
+    for sphere in spheres:
+        [nearSq, farSq] = _cell_distances(centers, half, sphere)
+        outside |= (nearSq > sphere[3]**2) | (farSq < sphere[4]**2)
+        inside &= (farSq <= sphere[3]**2) & (nearSq >= sphere[4]**2)
+    for voidSphere in voidSpheres:
+        [nearSq, farSq] = _cell_distances(centers, half, voidSphere)
+        outside |= farSq < voidSphere[4]**2
+        inside &= nearSq >= voidSphere[4]**2
+    return np.where(outside, 0, np.where(inside, 1, 2))
+
+def _cell_distances(centers, half, sphere):
+    #squared distance from the sphere center to the nearest and furthest point of each cell
+    delta = np.abs(centers - sphere[0:3])
+    nearSq = (np.maximum(delta - half, 0)**2).sum(axis=1)
+    farSq = ((delta + half)**2).sum(axis=1)
+    return [nearSq, farSq]
+
+@timed_stage("octree")
+def octree_region(spheres, voidSpheres, box=None, maxDepth=None, maxCells=None):
+    """finds the valid region of a sphere list by recursively splitting its bounding box into octree cells
+    cells fully inside or outside every sphere are settled, only cells straddling an edge are split again,
+    down to maxDepth levels or until a level would hold more than maxCells cells
+    the inside and edge cells together are guaranteed to cover the whole valid region
+    box = [[xmin, ymin, zmin], [xmax, ymax, zmax]], defaults to intersection_box(spheres)
+
+    returns {"center": [x, y, z], "volume": v, "volumeRange": [vmin, vmax], "box": [[xmin, ymin, zmin], [xmax, ymax, zmax]],
+             "cells": array of cell centers shape (n, 3), "cellHalf": array of matching half sizes shape (n, 3)}
+    volume counts edge cells by the fraction of a 2x2x2 grid of test points inside them, vmin and vmax count none or all of them
+    center is None when no valid cells are found"""
+    maxDepth = config.octreeDepth if maxDepth is None else maxDepth
+    maxCells = config.octreeMaxCells if maxCells is None else maxCells
+    spheres = np.asarray(spheres, dtype=float).reshape(-1, 5)
+    voidSpheres = np.asarray(voidSpheres, dtype=float).reshape(-1, 5)
+    region = {"center": None, "volume": 0, "volumeRange": [0, 0], "box": None, "cells": np.empty((0, 3)), "cellHalf": np.empty((0, 3))}
+    if box is None:
+        box = intersection_box(spheres) if len(spheres) > 0 else None
+        if box is None:
+            return region
+    box = np.asarray(box, dtype=float)
+    half = (box[1] - box[0]) / 2
+    cells = ((box[0] + box[1]) / 2)[np.newaxis, :]
+    leaves = []     #[centers, half, weight of each cell]
+    for depth in range(maxDepth + 1):
+        status = classify_cells(cells, half, spheres, voidSpheres)
+        inside = cells[status == 1]
+        leaves.append([inside, half, np.ones(len(inside))])
+        edge = cells[status == 2]
+        if depth == maxDepth or len(edge) * 8 > maxCells:
+            #count each remaining edge cell by how many of a 2x2x2 grid of points inside it are valid
+            testPoints = (edge[:, np.newaxis, :] + _octants * half / 2).reshape(-1, 3)
+            fraction = ConstraintEngine(spheres, voidSpheres).mask(testPoints).reshape(-1, 8).mean(axis=1)
+            leaves.append([edge, half, fraction])
+            break
+        cells = (edge[:, np.newaxis, :] + _octants * half / 2).reshape(-1, 3)
+        half = half / 2
+
+    centers = np.concatenate([leaf[0] for leaf in leaves])
+    halves = np.concatenate([np.tile(leaf[1], (len(leaf[0]), 1)) for leaf in leaves])
+    weights = np.concatenate([leaf[2] for leaf in leaves])
+    volumes = np.prod(2 * halves, axis=1)
+    edgeVolume = np.prod(2 * leaves[-1][1]) * len(leaves[-1][0])
+    region["cells"] = centers
+    region["cellHalf"] = halves
+    if len(centers) == 0:
+        return region
+    region["volumeRange"] = [float(volumes.sum() - edgeVolume), float(volumes.sum())]
+    region["volume"] = float((volumes * weights).sum())
+    region["box"] = np.array([(centers - halves).min(axis=0), (centers + halves).max(axis=0)])
+    if region["volume"] > 0:
+        region["center"] = ((centers * (volumes * weights)[:, np.newaxis]).sum(axis=0) / region["volume"]).tolist()
+    return region
+
+def octree_sampler(region):
+    """returns a sampler(n, rng) that generates n points uniformly within the cells of an octree_region
+    (inside and edge cells), cells are picked in proportion to their volume"""
+    cells = region["cells"]
+    halves = region["cellHalf"]
+    volumes = np.prod(2 * halves, axis=1)
+    def sampler(n, rng=None):
+        if len(cells) == 0:
+            return np.empty((0, 3))
+        if rng is None:
+            rng = np.random.default_rng()
+        pick = rng.choice(len(cells), size=n, p=volumes / volumes.sum())
+        return cells[pick] + halves[pick] * rng.uniform(-1, 1, (n, 3))
+    return sampler
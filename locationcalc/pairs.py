@@ -0,0 +1,83 @@
+import numpy as np
+
+_neighbourCells = [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)]
+
+class PairIndex:
+    """keeps track of the overlapping pair of spheres with the smallest overlap distance as spheres are added
+
+    sphere centres are hashed into a grid of cubic cells at least as wide as the largest sphere diameter, so two spheres
+    can only overlap if their centres are in the same or neighbouring cells. adding a sphere only checks it against the
+    spheres in the 27 cells around it (all at once with numpy) instead of every pair being checked again.
+    the cells are rebuilt with a wider size when a sphere larger than any before is added, growing the size by at
+    least double each time so rebuilds stay rare
+
+    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ]
+    best = [overlap, i, j] for the best pair spheres[i], spheres[j] with i < j, or None if no pair overlaps"""
+    def __init__(self, spheres=()):
+        self.spheres = []
+        self.centers = np.empty((0, 3))
+        self.radii = np.empty(0)
+        self.cells = {}
+        self.cellSize = 0
+        self.best = None
+        for sphere in spheres:
+            self.add(sphere)
+
+    def __len__(self):
+        return len(self.spheres)
+
+    def _cell(self, center):
+        return tuple(np.floor(np.asarray(center) / self.cellSize).astype(np.int64))
+
+    def _rebuild(self, cellSize):
+        self.cellSize = cellSize
+        self.cells = {}
+        for i, center in enumerate(self.centers[:len(self.spheres)]):
+            self.cells.setdefault(self._cell(center), []).append(i)
+
+    def add(self, sphere):
+        """adds sphere = [x, y, z, r1, r2] and updates best
+        returns [overlap, i, j] for the best pair containing the new sphere, or None if it overlaps nothing"""
+        i = len(self.spheres)
+        center = np.asarray(sphere[0:3], dtype=float)
+        radius = float(sphere[3])
+        #arrays grow by doubling so adding stays cheap on average
+        if i == len(self.radii):
+            self.centers = np.concatenate([self.centers, np.empty((max(i, 8), 3))])
+            self.radii = np.concatenate([self.radii, np.empty(max(i, 8))])
+        self.spheres.append(sphere)
+        self.centers[i] = center
+        self.radii[i] = radius
+        if 2*radius > self.cellSize:
+            #rebuild also indexes the new sphere
+            self._rebuild(max(2*radius, 2*self.cellSize))
+        else:
+            self.cells.setdefault(self._cell(center), []).append(i)
+
+        #earlier spheres in the cells around the new one
+        cell = self._cell(center)
+        candidates = [j for offset in _neighbourCells for j in self.cells.get((cell[0] + offset[0], cell[1] + offset[1], cell[2] + offset[2]), ()) if j < i]
+        if len(candidates) == 0:
+            return None
+        candidates = np.array(candidates)
+        distance = np.sqrt(((self.centers[candidates] - center)**2).sum(axis=1))
+        overlap = self.radii[candidates] + radius - distance
+        #concentric spheres and repeats of the same sphere have no single axis to build a lens on
+        keep = (overlap > 0) & (distance != 0)
+        if not keep.any():
+            return None
+        candidates = candidates[keep]
+        overlap = overlap[keep]
+        #lowest index first when overlaps tie so the pair picked matches a scan of the list in order
+        order = np.lexsort((candidates, overlap))[0]
+        found = [float(overlap[order]), int(candidates[order]), i]
+        if self.best is None or found[0] < self.best[0]:
+            self.best = found
+        return found
+
+    def best_pair(self):
+        """returns [[sphereOne, sphereTwo], overlap] for the best pair, or [] if no pair overlaps"""
+        if self.best is None:
+            return []
+        [overlap, i, j] = self.best
+        return [(self.spheres[i], self.spheres[j]), overlap]
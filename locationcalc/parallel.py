@@ -0,0 +1,96 @@
+import concurrent.futures
+import contextlib
+import sys
+import numpy as np
+
+from . import config
+from .analytic import analytic_region
+from .constraints import ConstraintEngine, prune_constraints, update_list
+from .solver import exact_summary, sampling_domain, solve_problem, summarise
+from .stats import Reservoir, RunningStats
+
+def _scatter_chunk(spheres, voidSpheres, samples, seedSequence):
+    #one chunk of a parallel search, runs in a worker process
+    #returns [validPoints, stats, drawn, volume] where volume is this chunk's estimate of the valid volume
+    rng = np.random.default_rng(seedSequence)
+    [bestOverlap, bestSphere, sampler] = sampling_domain(spheres)
+    stats = RunningStats()
+    if sampler.volume == 0:
+        return [np.empty((0, 3)), stats, 0, 0]
+    validPoints = ConstraintEngine(spheres, voidSpheres).filter(sampler(samples, rng))
+    stats.update(validPoints)
+    return [validPoints, stats, samples, sampler.volume * len(validPoints) / samples]
+
+def parallel_scatter(spheres, voidSpheres, samples=None, workers=None, seed=None, chunkSamples=None, executor=None, keepPoints=None):
+    """generates valid points for a sphere list with the samples budget split over worker processes
+    the budget is cut into chunks of chunkSamples and each chunk gets its own random stream spawned from seed,
+    chunks are merged in order so the result only depends on seed, not on the number of workers or which finishes first
+    executor can be an existing concurrent.futures executor to reuse, otherwise a process pool of workers is started
+    chunks are reduced as they come back, keeping a uniform sample of at most keepPoints valid points
+    settings that are not given come from config
+    returns [validPoints, stats, drawn, volume]"""
+    samples = config.samples if samples is None else samples
+    workers = config.workers if workers is None else workers
+    chunkSamples = config.parallelChunk if chunkSamples is None else chunkSamples
+    keepPoints = config.maxKeptPoints if keepPoints is None else keepPoints
+    sizes = [chunkSamples] * (samples // chunkSamples)
+    if samples % chunkSamples > 0:
+        sizes.append(samples % chunkSamples)
+    #one extra stream for picking the kept points
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes) + 1)
+    arguments = [[spheres] * len(sizes), [voidSpheres] * len(sizes), sizes, seeds[:-1]]
+    stats = RunningStats()
+    reservoir = Reservoir(keepPoints, np.random.default_rng(seeds[-1]))
+    [drawn, volume] = [0, 0]
+    def reduce(chunks):
+        nonlocal drawn, volume
+        for [validPoints, chunkStats, chunkDrawn, chunkVolume] in chunks:
+            stats.merge(chunkStats)
+            reservoir.update(validPoints)
+            drawn += chunkDrawn
+            volume += chunkVolume * chunkDrawn
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            reduce(pool.map(_scatter_chunk, *arguments))
+    else:
+        reduce(executor.map(_scatter_chunk, *arguments))
+    return [reservoir.points(), stats, drawn, volume / drawn if drawn > 0 else 0]
+
+def parallel_solve(spheres, voidSpheres=(), options=None, executor=None):
+    """same as solve but draws a fixed budget of samples points split over worker processes, see parallel_scatter
+    options = {name: value} overrides the settings in config, workers, parallelChunk, samples and seed are used here
+    returns the summary dict described in solver.summarise"""
+    options = config.options(options)
+    [sphereList, voidList, removedSpheres] = [[], [], []]
+    for sphere in list(spheres) + list(voidSpheres):
+        sphere = list(sphere) + [0] * (len(sphere) == 4)
+        [sphereList, voidList, removedSpheres] = update_list(sphereList, voidList, removedSpheres, sphere)
+    [sphereList, voidList, removedSpheres, box] = prune_constraints(sphereList, voidList, removedSpheres)
+    if box is not None and options["analytic"]:
+        region = analytic_region(sphereList, voidList)
+        if region is not None:
+            return exact_summary(region)
+    if box is None:
+        return summarise(np.empty((0, 3)), RunningStats(), 0, 0, options["minRegionMass"])
+    [validPoints, stats, drawn, volume] = parallel_scatter(sphereList, voidList, options["samples"], options["workers"], options["seed"],
+                                                           options["parallelChunk"], executor, options["maxKeptPoints"])
+    return summarise(validPoints, stats, volume, drawn, options["minRegionMass"])
+
+def _quiet_solve_problem(problem, options):
+    #anything the solver prints goes to stderr so it never mixes with results written to stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        return solve_problem(problem, options)
+
+def solve_many(problems, options=None, workers=None):
+    """solves many independent problem dicts (see solver.solve_problem) at once, one search per worker process at a time
+    results come back in the same order as problems, each search runs serially within its worker
+    returns an iterator of results"""
+    workers = config.workers if workers is None else workers
+    problems = list(problems)
+    if workers <= 1:
+        return map(_quiet_solve_problem, problems, [options] * len(problems))
+    #the pool is shut down once every result has been handed out
+    def results():
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            yield from pool.map(_quiet_solve_problem, problems, [options] * len(problems))
+    return results()
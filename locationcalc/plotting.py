@@ -0,0 +1,147 @@
+import numpy as np
+
+from .profiling import timed_stage
+from .regions import _voxel_keys
+
+""" def plot_points(plotPoints):
+    fig = plt.figure()
+    ax = fig.add_subplot(projection='3d')
+    for point in plotPoints[:maxPoints]:
+        ax.scatter(xs = point[0], ys = point[1], zs = point[2], c='r', marker='o')
+    ax.set_xlabel('X')
+    ax.set_ylabel('Z')
+    ax.set_zlabel('Y')
+    ax.set_autoscale_on(True)
+    plt.show() """
+
+def voxel_downsample(points, maxPoints=20000, rounds=10):
+    """bins points into cubic voxels just large enough that at most maxPoints voxels are filled
+    returns [centers, weights] where centers (shape (n, 3)) is the mean of the points in each filled voxel
+    and weights the number of points in it"""
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    if len(points) <= maxPoints:
+        return [points, np.ones(len(points), dtype=int)]
+    low = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - low, 1e-9)
+    cellSize = (np.prod(extent) / maxPoints) ** (1/3)
+    for i in range(rounds):
+        [unique, inverse] = np.unique(_voxel_keys(points, low, cellSize)[0], return_inverse=True)
+        if len(unique) <= maxPoints:
+            break
+        #a thin shell fills voxels by area rather than volume, so grow by the square root to get there quicker
+        cellSize *= (len(unique) / maxPoints) ** (1/2)
+    weights = np.bincount(inverse)
+    centers = np.column_stack([np.bincount(inverse, points[:, axis]) for axis in range(3)]) / weights[:, np.newaxis]
+    return [centers, weights]
+
+def region_mesh(points, maxCells=48, minCount=1):
+    """surface of the filled voxels of a point cloud, as a triangle mesh
+    the longest side of the cloud is split into maxCells voxels, voxels with at least minCount points are filled and
+    a square (two triangles) is made for every face between a filled and an empty voxel
+    returns [vertices, triangles] where vertices has shape (n, 3) and triangles (m, 3) holds indices into vertices"""
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    if len(points) == 0:
+        return [np.empty((0, 3)), np.empty((0, 3), dtype=int)]
+    low = points.min(axis=0)
+    cellSize = max(float((points.max(axis=0) - low).max()) / maxCells, 1e-9)
+    [keys, dims] = _voxel_keys(points, low, cellSize)
+    filled = (np.bincount(keys, minlength=int(np.prod(dims))) >= minCount).reshape(dims)
+
+    corners = []
+    for axis in range(3):
+        #faces sit on the plane between voxel index and index + 1 along axis
+        change = np.diff(filled.astype(np.int8), axis=axis) != 0
+        faces = np.argwhere(change)
+        faces[:, axis] += 1
+        [u, v] = [a for a in range(3) if a != axis]
+        square = np.repeat(faces[:, np.newaxis, :], 4, axis=1)
+        square[:, 1, u] += 1
+        square[:, 2, u] += 1
+        square[:, 2, v] += 1
+        square[:, 3, v] += 1
+        corners.append(square.reshape(-1, 3))
+    corners = np.concatenate(corners)
+    [gridVertices, index] = np.unique(corners, axis=0, return_inverse=True)
+    index = index.reshape(-1, 4)
+    triangles = np.concatenate([index[:, [0, 1, 2]], index[:, [0, 2, 3]]])
+    #voxel keys carry a one voxel border
+    vertices = low + (gridVertices - 1) * cellSize
+    return [vertices, triangles]
+
+def sphere_wireframe(sphere, radius=None, circles=4, segments=24):
+    """low poly wire outline of a sphere = [x, y, z, r1, r2], circles lines of latitude and 2 * circles of longitude
+    radius defaults to the outer radius
+    returns [x, y, z] lists of line points, with None between separate lines (for a plotly lines trace)"""
+    radius = sphere[3] if radius is None else radius
+    angles = np.linspace(0, 2*np.pi, segments + 1)
+    lines = []
+    for latitude in np.linspace(-np.pi/2, np.pi/2, circles + 2)[1:-1]:
+        ring = radius * np.cos(latitude)
+        lines.append(np.column_stack([ring*np.cos(angles), ring*np.sin(angles), np.full(len(angles), radius*np.sin(latitude))]))
+    for longitude in np.linspace(0, np.pi, 2*circles, endpoint=False):
+        lines.append(np.column_stack([radius*np.cos(angles)*np.cos(longitude), radius*np.cos(angles)*np.sin(longitude), radius*np.sin(angles)]))
+    [xs, ys, zs] = [[], [], []]
+    for line in lines:
+        line = line + sphere[0:3]
+        xs.extend(line[:, 0].tolist() + [None])
+        ys.extend(line[:, 1].tolist() + [None])
+        zs.extend(line[:, 2].tolist() + [None])
+    return [xs, ys, zs]
+
+@timed_stage("plotting")
+def plot_search(points, spheres=(), voidSpheres=(), maxPoints=20000, surface=True, meshCells=48, html=None, show=True):
+    """plots the valid points of a search, light enough to stay quick however many points there are
+    points are shown as at most maxPoints voxel averages sized and coloured by how many points they stand for (see
+    voxel_downsample), surface adds the outline of the filled voxels as a see-through mesh (see region_mesh), and
+    spheres and voidSpheres are drawn as wireframes (inner radius too for hollow spheres)
+    the plot uses the game's axes, with y up
+    html is an optional file name to also save the plot to (plotly.js is loaded from the web to keep it small)
+    returns the plotly figure"""
+    #plotly is slow to import, it is only loaded once something is plotted
+    import plotly.graph_objects as go
+
+    #y is up in game, z is up in plotly
+    def axes(x, y, z):
+        return {"x": x, "y": z, "z": y}
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    traces = []
+    if maxPoints > 0 and len(points) > 0:
+        [centers, weights] = voxel_downsample(points, maxPoints)
+        traces.append(go.Scatter3d(**axes(centers[:, 0], centers[:, 1], centers[:, 2]), mode='markers', name="valid points",
+                                   text=["points: " + str(weight) for weight in weights.tolist()],
+                                   marker=dict(size=2 + 4*np.sqrt(weights / weights.max()), color=weights, colorscale="Viridis", opacity=0.6)))
+    if surface and len(points) > 0:
+        [vertices, triangles] = region_mesh(points, meshCells)
+        traces.append(go.Mesh3d(**axes(vertices[:, 0], vertices[:, 1], vertices[:, 2]), i=triangles[:, 0], j=triangles[:, 1], k=triangles[:, 2],
+                                opacity=0.2, color="royalblue", flatshading=True, name="valid region", hoverinfo="skip"))
+    for sphere in spheres:
+        for radius in [sphere[3]] + ([sphere[4]] if sphere[4] > 0 else []):
+            traces.append(go.Scatter3d(**axes(*sphere_wireframe(sphere, radius)), mode='lines', line=dict(color="gray", width=1),
+                                       name=str(sphere), hoverinfo="name", showlegend=False))
+    for sphere in voidSpheres:
+        traces.append(go.Scatter3d(**axes(*sphere_wireframe(sphere, sphere[4])), mode='lines', line=dict(color="firebrick", width=1),
+                                   name=str(sphere), hoverinfo="name", showlegend=False))
+
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        scene=dict(
+            xaxis_title='X',
+            yaxis_title='Z',
+            zaxis_title='Y'
+        ),
+        title=f"{len(points):,} valid points"
+    )
+    fig.update_scenes(aspectmode="data")
+    if html is not None:
+        fig.write_html(html, include_plotlyjs="cdn")
+    if show:
+        fig.show()
+    return fig
+
+def plot_scatter3d(points, max_points=200_000):
+    """plots points as at most max_points voxel averages, see plot_search"""
+    return plot_search(points, maxPoints=max_points, surface=False)
+
+def plot_volume(points, bins=50):
+    """plots the outline of the region filled by points, split into bins voxels along its longest side, see region_mesh"""
+    return plot_search(points, maxPoints=0, meshCells=bins)
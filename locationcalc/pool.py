@@ -0,0 +1,100 @@
+import collections
+import functools
+import math
+import numpy as np
+
+from . import config
+from .geometry import orthonormal_basis
+from .qmc import halton
+from .sampling import unit_cylinder, unit_shell
+
+def random_rotation(rng):
+    """returns a uniformly random 3x3 rotation (or reflection) matrix"""
+    [q, r] = np.linalg.qr(rng.normal(0, 1, (3, 3)))
+    return q * np.sign(np.diag(r))
+
+class SamplePool:
+    """cache of large blocks of unit shape samples that are reused for every sphere or cylinder of that shape
+
+    a block of points in the unit ball (or unit shell, one block per inner/outer radius ratio) or unit cylinder is made
+    once, after which a request for n points is a slice of the block starting at a random place, mapped onto the wanted
+    shape with a single matrix multiply and add: the matrix scales the block and turns it by a random rotation drawn for
+    each call, so repeated calls do not return the same points. requests larger than a block take several slices, each
+    with its own rotation
+
+    blocks are kept in least recently used order and the oldest is dropped when there are more than maxBlocks
+    sequence is "random" for pseudo random blocks or "halton" for blocks made from the low discrepancy Halton sequence
+    seed sets the random generator used to make the blocks"""
+    def __init__(self, blockSize=None, maxBlocks=None, sequence=None, seed=None):
+        self.blockSize = config.samplePoolSize if blockSize is None else blockSize
+        self.maxBlocks = config.samplePoolBlocks if maxBlocks is None else maxBlocks
+        self.sequence = config.samplePoolSequence if sequence is None else sequence
+        if self.sequence not in ("random", "halton"):
+            raise ValueError("unknown sample pool sequence: " + str(self.sequence))
+        self.rng = np.random.default_rng(seed)
+        self.blocks = collections.OrderedDict()
+
+    def _uniforms(self):
+        if self.sequence == "halton":
+            return halton(self.blockSize, 3)
+        return self.rng.random((self.blockSize, 3))
+
+    def block(self, key):
+        """returns the block of unit samples for key, making it if it is not cached
+        key = ("shell", innerRatio) or ("cylinder",)"""
+        if key in self.blocks:
+            self.blocks.move_to_end(key)
+            return self.blocks[key]
+        if key[0] == "shell":
+            block = unit_shell(self._uniforms(), key[1])
+        else:
+            block = unit_cylinder(self._uniforms())
+        self.blocks[key] = block
+        while len(self.blocks) > self.maxBlocks:
+            self.blocks.popitem(last=False)
+        return block
+
+    def _mapped(self, block, samples, rng, transform, offset):
+        #slices of block, each passed through transform(rng) = 3x3 matrix, plus offset
+        points = np.empty((samples, 3))
+        done = 0
+        while done < samples:
+            count = min(samples - done, len(block))
+            start = rng.integers(len(block))
+            stop = min(start + count, len(block))
+            matrix = transform(rng)
+            np.matmul(block[start:stop], matrix, out=points[done:done + stop - start])
+            if stop - start < count:
+                np.matmul(block[0:count - (stop - start)], matrix, out=points[done + stop - start:done + count])
+            done += count
+        points += offset
+        return points
+
+    def sphere(self, sphere, samples, rng=None):
+        """same as sampling.sphere_scatter, but mapped from a cached block
+        sphere = [x, y, z, outer_radius, inner_radius]
+        returns array of points shape (samples, 3)"""
+        if rng is None:
+            rng = np.random.default_rng()
+        [r1, r2] = [sphere[3], sphere[4]]
+        block = self.block(("shell", r2 / r1))
+        return self._mapped(block, samples, rng, lambda rng: r1 * random_rotation(rng), np.asarray(sphere[0:3], dtype=float))
+
+    def cylinder(self, d1, radius, vector, center, samples, rng=None):
+        """same as sampling.cyl_scatter, but mapped from a cached block
+        returns array of points shape (samples, 3)"""
+        if rng is None:
+            rng = np.random.default_rng()
+        basis = orthonormal_basis(vector)
+        def transform(rng):
+            #random turn around the cylinder axis and random flip along it
+            angle = rng.uniform(0, 2*np.pi)
+            [c, s] = [math.cos(angle), math.sin(angle)]
+            turn = np.array([[rng.choice([-1, 1]) * d1, 0, 0], [0, c*radius, s*radius], [0, -s*radius, c*radius]])
+            return turn @ basis
+        return self._mapped(self.block(("cylinder",)), samples, rng, transform, np.asarray(center, dtype=float))
+
+@functools.lru_cache(maxsize=None)
+def shared_pool(blockSize=None, maxBlocks=None, sequence=None):
+    """returns one SamplePool per set of settings, shared by every search in this process"""
+    return SamplePool(blockSize, maxBlocks, sequence)
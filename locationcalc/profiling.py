@@ -0,0 +1,115 @@
+import collections
+import contextlib
+import functools
+import json
+import time
+
+#the profiler currently recording, None when profiling is off (the usual case, every hook then does nothing)
+_active = None
+
+class Profiler:
+    """wall time per solver stage and named counters, recorded while it is active (see profiled)
+    stages = {name: [calls, seconds]}, counters = {name: count}
+    stages can be nested, each one's time includes the stages inside it
+    with cprofile set a cProfile.Profile also runs while active, for a function level breakdown"""
+    def __init__(self, cprofile=False):
+        self.stages = collections.defaultdict(lambda: [0, 0.])
+        self.counters = collections.Counter()
+        self.profile = None
+        if cprofile:
+            import cProfile
+            self.profile = cProfile.Profile()
+
+    def add_time(self, name, seconds):
+        stage = self.stages[name]
+        stage[0] += 1
+        stage[1] += seconds
+
+    def count(self, name, amount=1):
+        self.counters[name] += int(amount)
+
+    def report(self):
+        """returns {"stages": {name: {"calls": n, "seconds": s}}, "counters": {name: count}}, stages slowest first"""
+        stages = sorted(self.stages.items(), key=lambda item: item[1][1], reverse=True)
+        return {"stages": {name: {"calls": calls, "seconds": seconds} for name, [calls, seconds] in stages},
+                "counters": dict(self.counters)}
+
+    def write_json(self, fileName):
+        """saves report() to fileName as json"""
+        with open(fileName, "w") as outputFile:
+            json.dump(self.report(), outputFile, indent=1)
+
+    def write_cprofile(self, fileName):
+        """saves the cProfile data (made with cprofile=True) to fileName, readable with pstats or snakeviz"""
+        if self.profile is None:
+            raise ValueError("profiler was made without cprofile=True")
+        self.profile.dump_stats(fileName)
+
+    def print_report(self):
+        report = self.report()
+        for name, stage in report["stages"].items():
+            print(f"{name:>20}: {stage['seconds']*1000:10.1f} ms in {stage['calls']} calls")
+        for name, count in sorted(report["counters"].items()):
+            print(f"{name:>20}: {count}")
+
+@contextlib.contextmanager
+def profiled(profiler=None, cprofile=False):
+    """records solver stages and counters into profiler (a new Profiler if not given) inside the with block
+        with profiled() as profiler:
+            solve(spheres)
+        profiler.print_report()
+    only one profiler records at a time, stages run in other processes are not seen"""
+    global _active
+    profiler = Profiler(cprofile) if profiler is None else profiler
+    [previous, _active] = [_active, profiler]
+    if profiler.profile is not None:
+        profiler.profile.enable()
+    try:
+        yield profiler
+    finally:
+        if profiler.profile is not None:
+            profiler.profile.disable()
+        _active = previous
+
+class _Stage:
+    #context manager timing one stage into the active profiler, or nothing if there is none
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter() if _active is not None else None
+
+    def __exit__(self, *exception):
+        if self.start is not None and _active is not None:
+            _active.add_time(self.name, time.perf_counter() - self.start)
+
+def stage(name):
+    """with stage("name"): ... adds the time spent in the block to the active profiler"""
+    return _Stage(name)
+
+def count(name, amount=1):
+    """adds amount to a counter of the active profiler"""
+    if _active is not None:
+        _active.count(name, amount)
+
+def enabled():
+    """returns True while a profiler is recording"""
+    return _active is not None
+
+def timed_stage(name):
+    """decorator recording each call of a function as stage name"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                if _active is not None:
+                    _active.add_time(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,56 @@
+import math
+import numpy as np
+
+_primes = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+
+def radical_inverse(indices, base, permutation=None):
+    """returns the van der Corput radical inverse of each integer in indices for a base
+    (the digits of the index in that base mirrored around the decimal point)
+    permutation is an optional array that every digit is passed through"""
+    #the inverse of every group of digits that fits in a table of about 4096 entries is looked up at once
+    digits = max(1, int(math.log(4096, base)))
+    size = base**digits
+    table = np.zeros(size)
+    small = np.arange(size)
+    scale = 1 / base
+    for i in range(digits):
+        table += scale * (small % base if permutation is None else permutation[small % base])
+        small //= base
+        scale /= base
+
+    indices = np.array(indices, dtype=np.int64)
+    result = np.zeros(len(indices))
+    scale = 1.
+    while (indices > 0).any():
+        result += scale * table[indices % size]
+        indices //= size
+        scale /= size
+    return result
+
+def halton(samples, dimensions, start=0):
+    """returns points samples..start+samples of the Halton sequence, array shape (samples, dimensions) in [0, 1)
+    the sequence starts at index 1 (start=0) since index 0 is the corner point [0, 0, ...]"""
+    if dimensions > len(_primes):
+        raise ValueError("halton supports up to " + str(len(_primes)) + " dimensions")
+    indices = np.arange(start + 1, start + samples + 1)
+    return np.column_stack([radical_inverse(indices, base) for base in _primes[:dimensions]])
+
+def scrambled_halton(samples, dimensions, rng=None):
+    """returns samples points of a randomised Halton sequence, array shape (samples, dimensions) in [0, 1)
+    each dimension has its digits shuffled by a random permutation (keeping 0 as 0 so the digits past the end stay 0),
+    the sequence starts at a random index, and a random shift is added modulo 1 so every point is uniform on its own.
+    the points keep the even spread of the plain sequence, while separate calls give independent sets
+    rng is an optional numpy.random.Generator, a fresh one is used if not given"""
+    if dimensions > len(_primes):
+        raise ValueError("halton supports up to " + str(len(_primes)) + " dimensions")
+    if rng is None:
+        rng = np.random.default_rng()
+    start = int(rng.integers(1, 2**20))
+    indices = np.arange(start, start + samples)
+    points = np.empty((samples, dimensions))
+    for dimension, base in enumerate(_primes[:dimensions]):
+        permutation = np.concatenate([[0], rng.permutation(np.arange(1, base))])
+        points[:, dimension] = radical_inverse(indices, base, permutation)
+    points += rng.random(dimensions)
+    points %= 1
+    return points
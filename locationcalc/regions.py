@@ -0,0 +1,84 @@
+import numpy as np
+
+from .profiling import timed_stage
+
+#offsets to half of the 26 neighbouring voxels, the other half is covered from the other side
+_neighbourOffsets = np.array([[i, j, k] for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1) if (i, j, k) > (0, 0, 0)])
+
+def _voxel_keys(points, low, cellSize):
+    #one integer per voxel, with a border of empty voxels so neighbour offsets never wrap around
+    voxels = np.floor((points - low) / cellSize).astype(np.int64) + 1
+    dims = voxels.max(axis=0) + 2
+    keys = (voxels[:, 0] * dims[1] + voxels[:, 1]) * dims[2] + voxels[:, 2]
+    return [keys, dims]
+
+@timed_stage("regions")
+def find_regions(points, cellSize=None, totalVolume=None, linkFactor=2.5):
+    """splits a set of valid points into connected regions
+    points are binned into voxels of cellSize and voxels touching each other (including diagonals) are joined into one region
+    cellSize defaults to linkFactor times the average spacing between points
+    totalVolume is the volume of the whole valid region if known, used to give each region a share of it by point count,
+    otherwise each region's volume is estimated from its occupied voxels
+
+    returns list of regions sorted by point count, largest first
+    region = {"center": [x, y, z], "box": [[xmin, ymin, zmin], [xmax, ymax, zmax]], "volume": v, "count": n, "mass": fraction of all points}"""
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    if len(points) == 0:
+        return []
+    low = points.min(axis=0)
+    if cellSize is None:
+        #first guess from the bounding box, then again from the voxels that guess actually fills (tighter for thin shells)
+        extent = np.maximum(points.max(axis=0) - low, 1e-9)
+        cellSize = linkFactor * (np.prod(extent) / len(points)) ** (1/3)
+        occupied = len(np.unique(_voxel_keys(points, low, cellSize)[0]))
+        cellSize = linkFactor * (occupied * cellSize**3 / len(points)) ** (1/3)
+    [keys, dims] = _voxel_keys(points, low, cellSize)
+    [voxelKeys, pointVoxel] = np.unique(keys, return_inverse=True)
+    pointVoxel = pointVoxel.reshape(-1)
+
+    #pairs of occupied neighbouring voxels
+    edgeFrom = []
+    edgeTo = []
+    for offset in _neighbourOffsets:
+        neighbourKeys = voxelKeys + (offset[0] * dims[1] + offset[1]) * dims[2] + offset[2]
+        index = np.minimum(np.searchsorted(voxelKeys, neighbourKeys), len(voxelKeys) - 1)
+        found = voxelKeys[index] == neighbourKeys
+        edgeFrom.append(np.nonzero(found)[0])
+        edgeTo.append(index[found])
+    edgeFrom = np.concatenate(edgeFrom)
+    edgeTo = np.concatenate(edgeTo)
+
+    #every voxel takes the lowest label among its neighbours until nothing changes
+    labels = np.arange(len(voxelKeys))
+    while True:
+        lowest = np.minimum(labels[edgeFrom], labels[edgeTo])
+        newLabels = labels.copy()
+        np.minimum.at(newLabels, labels[edgeFrom], lowest)
+        np.minimum.at(newLabels, labels[edgeTo], lowest)
+        newLabels = newLabels[newLabels]
+        while not np.array_equal(newLabels, newLabels[newLabels]):
+            newLabels = newLabels[newLabels]
+        newLabels = np.minimum(labels, newLabels[labels])
+        if np.array_equal(newLabels, labels):
+            break
+        labels = newLabels
+    [regionIds, voxelRegion] = np.unique(labels, return_inverse=True)
+    pointRegion = voxelRegion.reshape(-1)[pointVoxel]
+
+    counts = np.bincount(pointRegion)
+    voxelCounts = np.bincount(voxelRegion.reshape(-1))
+    sums = np.stack([np.bincount(pointRegion, weights=points[:, axis]) for axis in range(3)], axis=1)
+    order = np.argsort(pointRegion, kind='stable')
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    mins = np.minimum.reduceat(points[order], starts, axis=0)
+    maxs = np.maximum.reduceat(points[order], starts, axis=0)
+
+    regions = []
+    for i in np.argsort(-counts, kind='stable'):
+        if totalVolume is None:
+            volume = voxelCounts[i] * cellSize**3
+        else:
+            volume = totalVolume * counts[i] / len(points)
+        regions.append({"center": (sums[i] / counts[i]).tolist(), "box": [mins[i].tolist(), maxs[i].tolist()],
+                        "volume": float(volume), "count": int(counts[i]), "mass": counts[i] / len(points)})
+    return regions
@@ -0,0 +1,194 @@
+import math
+import numpy as np
+
+from .geometry import orthonormal_basis, vector, vector_magnitude
+from .qmc import scrambled_halton
+
+def _uniforms(samples, rng, qmc):
+    #samples x 3 numbers in [0, 1), randomised Halton points when qmc is set
+    if qmc:
+        return scrambled_halton(samples, 3, rng)
+    return rng.random((samples, 3))
+
+def unit_shell(uniforms, innerRatio=0):
+    """maps uniforms (shape (n, 3)) in [0, 1) to uniform points in the unit ball with a hollow of radius innerRatio
+    evenly spread uniforms (e.g. Halton points) give evenly spread points
+    returns array of points shape (n, 3)"""
+    rad = (uniforms[:, 0] * (1 - innerRatio**3) + innerRatio**3) ** (1/3)
+    z = 1 - 2*uniforms[:, 1]
+    phi = 2*np.pi*uniforms[:, 2]
+    ring = np.sqrt(1 - z**2)
+    return np.column_stack([ring*np.cos(phi)*rad, ring*np.sin(phi)*rad, z*rad])
+
+def unit_cylinder(uniforms):
+    """maps uniforms (shape (n, 3)) in [0, 1) to uniform points in a cylinder of height 1 and radius 1
+    along the first axis, centered on the origin
+    returns array of points shape (n, 3)"""
+    r = np.sqrt(uniforms[:, 1])
+    theta = 2*np.pi*uniforms[:, 2]
+    return np.column_stack([uniforms[:, 0] - .5, r*np.cos(theta), r*np.sin(theta)])
+
+def sphere_scatter(sphere, samples, rng=None, pool=None, qmc=False):
+    """generates and returns a uniform spherical scatter in the described sphere
+    sphere = [x, y, z, outer_radius, inner_radius]
+    rng is an optional numpy.random.Generator, a fresh one is used if not given
+    pool is an optional pool.SamplePool to map cached unit samples from instead of drawing new ones
+    qmc uses randomised Halton points instead of pseudo random ones, which spreads them more evenly
+    returns array of points shape (samples, 3)"""
+    r1 = sphere[3]
+    r2 = sphere[4]
+    center = sphere[0:3]
+    if r2 < 0 or r1 <= r2:
+        raise ValueError("Require 0 <= r_inner < r_outer")
+    if pool is not None:
+        return pool.sphere(sphere, samples, rng)
+    if rng is None:
+        rng = np.random.default_rng()
+    if qmc:
+        return unit_shell(_uniforms(samples, rng, qmc), r2 / r1) * r1 + center
+    
+    #unit vectors for direction
+    v = rng.normal(0, 1, (samples, 3))
+    v /= np.linalg.norm(v, axis = 1)[:, np.newaxis]
+
+    #random radius within r1, r2
+    u = rng.random(samples)
+    rad = (u * (r1**3 - r2**3) + r2**3) ** (1/3)
+
+
+    #extend direction vectors by radius distribution, recenter samples
+    points = v * rad[:, np.newaxis]
+    points = points + center
+    return points
+
+def cyl_scatter(d1, radius, vector, center, samples, rng=None, pool=None, qmc=False):
+    """generates and returns a random cylindrical distribution
+
+    center = [x, y, z]      defines the center point of the cylinder
+    d1 defines the height of the cylinder
+    radius defines the radius of the cylinder
+    vector = [x, y, z]      defines the unit vector along which the height of the cylinder is parallel (each circle of the cylinder would lie on a plane normal to this vector)
+    rng is an optional numpy.random.Generator, a fresh one is used if not given
+    pool is an optional pool.SamplePool to map cached unit samples from instead of drawing new ones
+    qmc uses randomised Halton points instead of pseudo random ones, which spreads them more evenly
+    
+    returns array of points shape (samples, 3)"""
+    if pool is not None:
+        return pool.cylinder(d1, radius, vector, center, samples, rng)
+    if rng is None:
+        rng = np.random.default_rng()
+    basis = orthonormal_basis(vector)
+    if qmc:
+        return (unit_cylinder(_uniforms(samples, rng, qmc)) * [d1, radius, radius]) @ basis + center
+
+    #cylinder coordinates: height along vector between -.5d1 and .5d1, uniform position on the circle
+    local = np.empty((samples, 3))
+    local[:, 0] = rng.uniform(-.5*d1, .5*d1, samples)
+    theta = rng.uniform(0, 2 * np.pi, samples)
+    r = radius * np.sqrt(rng.random(samples))
+    local[:, 1] = r * np.cos(theta)
+    local[:, 2] = r * np.sin(theta)
+
+    #rotate into the basis and recenter
+    points = local @ basis
+    points += center
+    return points
+
+def box_scatter(box, samples, rng=None, qmc=False):
+    """generates and returns a uniform scatter in an axis aligned box
+    box = [[xmin, ymin, zmin], [xmax, ymax, zmax]]
+    rng is an optional numpy.random.Generator, a fresh one is used if not given
+    qmc uses randomised Halton points instead of pseudo random ones
+    returns array of points shape (samples, 3)"""
+    if rng is None:
+        rng = np.random.default_rng()
+    if qmc:
+        return box[0] + _uniforms(samples, rng, qmc) * np.subtract(box[1], box[0])
+    return rng.uniform(box[0], box[1], (samples, 3))
+
+def _lens_profile(sphereOne, sphereTwo, nodes=2049):
+    """tabulates the intersection of two (possibly hollow) spheres in spherical coordinates around one of them
+    a point at distance r from the chosen center satisfies the other sphere when the cosine of its angle to the
+    axis between the centers lies in [cosLow(r), cosHigh(r)], so the volume at radius r is proportional to
+    r**2 * (cosHigh - cosLow)
+    returns [sphereA, sphereB, axis, distance, radii, cdf] or None if the spheres do not intersect
+    where sphereA is the sphere the coordinates are centered on"""
+    best = None
+    for sphereA, sphereB in [(sphereOne, sphereTwo), (sphereTwo, sphereOne)]:
+        axis = np.array(vector(sphereA, sphereB), dtype=float)
+        distance = vector_magnitude(axis)
+        rMin = max(sphereA[4], distance - sphereB[3], sphereB[4] - distance, 0)
+        rMax = min(sphereA[3], distance + sphereB[3])
+        if rMax <= rMin:
+            return None
+        #tabulate around whichever sphere gives the narrower band of radii
+        if best is None or rMax - rMin < best[2] - best[3]:
+            best = [sphereA, sphereB, rMax, rMin, axis, distance]
+    [sphereA, sphereB, rMax, rMin, axis, distance] = best
+    radii = np.linspace(rMin, rMax, nodes)
+    cosLow, cosHigh = _lens_cos_range(radii, distance, sphereB)
+    density = radii**2 * (cosHigh - cosLow)
+    cdf = np.concatenate([[0], np.cumsum((density[1:] + density[:-1]) / 2 * np.diff(radii))])
+    if cdf[-1] <= 0:
+        return None
+    if distance > 0:
+        axis = axis / distance
+    else:
+        axis = np.array([0, 0, 1.])
+    return [sphereA, sphereB, axis, distance, radii, cdf]
+
+def _lens_cos_range(radii, distance, sphereB):
+    #allowed range of cos(angle to axis) at each radius, clipped to [-1, 1]
+    if distance == 0:
+        inside = (radii <= sphereB[3]) & (radii >= sphereB[4])
+        return np.full(len(radii), -1.), np.where(inside, 1., -1.)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cosLow = (radii**2 + distance**2 - sphereB[3]**2) / (2 * radii * distance)
+        cosHigh = (radii**2 + distance**2 - sphereB[4]**2) / (2 * radii * distance)
+    cosLow = np.clip(np.nan_to_num(cosLow, nan=1., posinf=1., neginf=-1.), -1, 1)
+    cosHigh = np.clip(np.nan_to_num(cosHigh, nan=1., posinf=1., neginf=-1.), -1, 1)
+    return cosLow, np.maximum(cosHigh, cosLow)
+
+def lens_volume(sphereOne, sphereTwo):
+    """Calculates and returns the volume of the intersection of two (possibly hollow) spheres
+    sphere = [x, y, z, rad1, rad2]
+    returns 0 if the spheres do not intersect"""
+    profile = _lens_profile(sphereOne, sphereTwo)
+    if profile is None:
+        return 0
+    return 2 * math.pi * profile[5][-1]
+
+def lens_scatter(sphereOne, sphereTwo, samples, rng=None, qmc=False):
+    """generates and returns a uniform scatter directly inside the intersection of two spheres
+    sphere = [x, y, z, outer_radius, inner_radius]
+    inner radii are respected, so hollow spheres give the matching hollow lens
+    every returned point lies within both spheres, no samples are wasted
+    rng is an optional numpy.random.Generator, a fresh one is used if not given
+    qmc uses randomised Halton points instead of pseudo random ones
+    returns array of points shape (samples, 3), empty if the spheres do not intersect"""
+    profile = _lens_profile(sphereOne, sphereTwo)
+    if profile is None:
+        return np.empty((0, 3))
+    if rng is None:
+        rng = np.random.default_rng()
+    [sphereA, sphereB, axis, distance, radii, cdf] = profile
+
+    #radius from the tabulated distribution, then cos(angle) uniform within the allowed range at that radius
+    if qmc:
+        uniforms = _uniforms(samples, rng, qmc)
+        [uRadius, uCos, phi] = [uniforms[:, 0], uniforms[:, 1], 2 * np.pi * uniforms[:, 2]]
+    else:
+        [uRadius, uCos, phi] = [rng.random(samples), rng.random(samples), rng.uniform(0, 2 * np.pi, samples)]
+    r = np.interp(uRadius * cdf[-1], cdf, radii)
+    cosLow, cosHigh = _lens_cos_range(r, distance, sphereB)
+    cosTheta = cosLow + uCos * (cosHigh - cosLow)
+    sinTheta = np.sqrt(np.clip(1 - cosTheta**2, 0, 1))
+
+    local = np.empty((samples, 3))
+    local[:, 0] = cosTheta
+    local[:, 1] = sinTheta * np.cos(phi)
+    local[:, 2] = sinTheta * np.sin(phi)
+    points = local @ orthonormal_basis(axis)
+    points *= r[:, np.newaxis]
+    points += sphereA[0:3]
+    return points
@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import json
+import time
+import numpy as np
+
+from . import config
+from .session import SessionStore
+from .solver import SearchState
+
+class SolverService:
+    """keeps independent searches for several clients and answers requests for them
+
+    requests are dicts {"op": ..., "session": name, "id": anything echoed back, ...} with op one of
+    add      {"spheres": [[x, y, z, r1, r2], ...], "options": {...}}  adds spheres, returns the search result
+    reset    {"options": {...}}                                      starts the session over
+    query    returns the search result (see solver.summarise)
+    plot     {"maxPoints": n}                                       returns up to n of the kept points (a random sample)
+    save / load                                                      writes or reads the session with a SessionStore
+    sessions returns the names of the open sessions
+    metrics  returns request counts, latencies and queue depth
+    options only apply when a session is created (first add, or reset), on top of the service options
+
+    query, plot and save need an existing session, they fail with "no session called ..." otherwise
+
+    the solver work runs in a thread pool so the event loop keeps answering while it runs (numpy releases the GIL for
+    most of it), requests for the same session are run one at a time in the order they arrive.
+    sessions is only changed on the event loop, the threads just work on the SearchState they are handed"""
+    solverOps = ("add", "reset", "query", "plot", "save", "load")
+
+    def __init__(self, options=None, workers=None, store=None):
+        self.options = dict(options or {})
+        self.executor = concurrent.futures.ThreadPoolExecutor(workers or config.workers)
+        self.store = store
+        self.sessions = {}
+        self.locks = collections.defaultdict(asyncio.Lock)
+        self.started = time.time()
+        self.waiting = 0
+        self.running = 0
+        self.maxQueue = 0
+        self.counts = collections.Counter()
+        self.errors = collections.Counter()
+        self.latencies = collections.defaultdict(lambda: collections.deque(maxlen=1000))
+
+    def _new_search(self, options=None):
+        sessionOptions = dict(self.options)
+        sessionOptions.update(options or {})
+        return SearchState(options=sessionOptions)
+
+    def _existing(self, name):
+        if name not in self.sessions:
+            raise KeyError("no session called " + repr(name))
+        return self.sessions[name]
+
+    async def _solve(self, op, name, request):
+        #runs on the event loop, only the work on a SearchState goes to the executor
+        run = functools.partial(asyncio.get_running_loop().run_in_executor, self.executor)
+        if op == "reset":
+            self.sessions[name] = self._new_search(request.get("options"))
+            return None
+        if op == "add":
+            search = self.sessions[name] if name in self.sessions else self._new_search(request.get("options"))
+            if "spheres" not in request:
+                raise ValueError("add needs spheres")
+            result = await run(_add, search, request["spheres"])
+            #a new session is only kept once its first add worked
+            self.sessions[name] = search
+            return result
+        if op == "query":
+            return await run(self._existing(name).result)
+        if op == "plot":
+            return await run(_plot_points, self._existing(name), request.get("maxPoints", 20000))
+        if op == "save":
+            await run(self._store().save, name, self._existing(name))
+            return None
+        if op == "load":
+            search = await run(self._store().load, name)
+            self.sessions[name] = search
+            return await run(search.result)
+
+    def _store(self):
+        if self.store is None:
+            self.store = SessionStore()
+        return self.store
+
+    async def handle(self, request):
+        """answers one request dict, returns {"id": ..., "ok": True, "result": ...} or {"id": ..., "ok": False, "error": message}"""
+        start = time.perf_counter()
+        op = request.get("op")
+        name = str(request.get("session", "default"))
+        try:
+            if op == "metrics":
+                result = self.metrics()
+            elif op == "sessions":
+                result = sorted(self.sessions)
+            else:
+                if op not in self.solverOps:
+                    raise ValueError("unknown op: " + str(op))
+                self.waiting += 1
+                self.maxQueue = max(self.maxQueue, self.waiting + self.running)
+                locked = False
+                try:
+                    async with self.locks[name]:
+                        [locked, self.waiting, self.running] = [True, self.waiting - 1, self.running + 1]
+                        try:
+                            result = await self._solve(op, name, request)
+                        finally:
+                            self.running -= 1
+                finally:
+                    if not locked:
+                        self.waiting -= 1
+            response = {"id": request.get("id"), "ok": True, "result": result}
+        except Exception as error:
+            self.errors[op] += 1
+            #str of a KeyError is quoted, use its message as is
+            message = error.args[0] if isinstance(error, KeyError) and len(error.args) == 1 else str(error)
+            response = {"id": request.get("id"), "ok": False, "error": str(message)}
+        self.counts[op] += 1
+        self.latencies[op].append(time.perf_counter() - start)
+        return response
+
+    def metrics(self):
+        """queue depth counts requests waiting for their session (waiting) and requests handed to the thread pool,
+        running or queued there (running)
+        returns {"uptime": s, "sessions": n, "queueDepth": waiting + running, "waiting": n, "running": n, "maxQueueDepth": n,
+                    "requests": {op: {"count", "errors", "meanMs", "p50Ms", "p95Ms", "maxMs"}}}
+        latency figures cover the last 1000 requests of each op"""
+        requests = {}
+        for op, latencies in self.latencies.items():
+            latencies = np.array(latencies) * 1000
+            requests[op] = {"count": self.counts[op], "errors": self.errors[op], "meanMs": float(latencies.mean()),
+                            "p50Ms": float(np.percentile(latencies, 50)), "p95Ms": float(np.percentile(latencies, 95)),
+                            "maxMs": float(latencies.max())}
+        return {"uptime": time.time() - self.started, "sessions": len(self.sessions), "queueDepth": self.waiting + self.running,
+                "waiting": self.waiting, "running": self.running, "maxQueueDepth": self.maxQueue, "requests": requests}
+
+    async def serve_client(self, reader, writer):
+        """answers line delimited json requests from one connection, one response line per request"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip() == b"":
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a json object")
+                except ValueError as error:
+                    response = {"id": None, "ok": False, "error": "bad request: " + str(error)}
+                else:
+                    response = await self.handle(request)
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        """listens for connections until cancelled"""
+        server = await asyncio.start_server(self.serve_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+def _add(search, spheres):
+    search.add_spheres(spheres)
+    return search.result()
+
+def _plot_points(search, maxPoints):
+    #up to maxPoints of the kept points, exact solutions generate some first
+    if len(search.points) == 0 and search.exact is not None:
+        search.top_up()
+    points = search.points
+    if len(points) > maxPoints:
+        points = points[np.random.default_rng().choice(len(points), maxPoints, replace=False)]
+    return np.asarray(points).tolist()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m locationcalc.service", description="Serve searches to several clients over a local socket, one JSON request and response per line.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (default 8765)")
+    parser.add_argument("--workers", type=int, default=4, help="threads running solver work (default 4)")
+    parser.add_argument("--option", action="append", default=[], metavar="NAME=VALUE",
+                        help="config setting for every session, VALUE is read as json, can be repeated")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {}
+    for option in args.option:
+        [name, value] = option.split("=", 1)
+        try:
+            options[name] = json.loads(value)
+        except ValueError:
+            options[name] = value
+    config.options(options)
+    service = SolverService(options, args.workers)
+    print("serving on ", args.host, ":", args.port)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import json
+import os
+import time
+import numpy as np
+
+from . import config
+from .analytic import analytic_region
+from .solver import SearchState
+from .stats import RunningStats
+
+def _stats_state(stats):
+    return {"count": stats.count, "mean": stats.mean.tolist(), "scatter": stats.scatter.tolist(),
+            "low": stats.low.tolist(), "high": stats.high.tolist()}
+
+def _load_stats(state):
+    stats = RunningStats()
+    stats.count = state["count"]
+    stats.mean = np.array(state["mean"], dtype=float)
+    stats.scatter = np.array(state["scatter"], dtype=float)
+    stats.low = np.array(state["low"], dtype=float)
+    stats.high = np.array(state["high"], dtype=float)
+    return stats
+
+class SessionStore:
+    """saves searches to disk so they can be resumed later without sampling again
+
+    each session is a folder under root holding state.json (sphere lists, totals and options) and the kept points as a
+    .npy file, which is opened memory mapped on load so resuming only costs opening the file.
+    points are written to a new file name on every save and state.json is replaced last, so a crash part way through
+    a save leaves the previous save readable
+    sessions are evicted least recently used first (saving or loading counts as use) once there are more than maxSessions
+    or they take more than maxBytes on disk
+    settings that are not given come from config (sessionDir, maxSessions, maxSessionBytes)"""
+    def __init__(self, root=None, maxSessions=None, maxBytes=None):
+        self.root = os.path.expanduser(config.sessionDir if root is None else root)
+        self.maxSessions = config.maxSessions if maxSessions is None else maxSessions
+        self.maxBytes = config.maxSessionBytes if maxBytes is None else maxBytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def _folder(self, name):
+        if name in ("", ".", "..") or os.sep in name or (os.altsep and os.altsep in name):
+            raise ValueError("invalid session name: " + repr(name))
+        return os.path.join(self.root, name)
+
+    def save(self, name, search):
+        """writes search (a SearchState) to the session called name, replacing any earlier save"""
+        folder = self._folder(name)
+        os.makedirs(folder, exist_ok=True)
+        pointsFile = "points-" + str(time.time_ns()) + ".npy"
+        np.save(os.path.join(folder, pointsFile), np.ascontiguousarray(search.points))
+        state = {"sphereList": search.sphereList, "voidSpheres": search.voidSpheres, "removedSpheres": search.removedSpheres, "readings": search.readings,
+                 "stats": _stats_state(search.stats), "volume": search.volume, "drawn": search.drawn,
+                 "options": search.options, "points": pointsFile, "saved": time.time()}
+        statePath = os.path.join(folder, "state.json")
+        with open(statePath + ".tmp", "w") as stateFile:
+            json.dump(state, stateFile)
+        os.replace(statePath + ".tmp", statePath)
+        #older point files, a file still memory mapped on windows is left for the next save to remove
+        for fileName in os.listdir(folder):
+            if fileName.startswith("points-") and fileName != pointsFile:
+                try:
+                    os.remove(os.path.join(folder, fileName))
+                except OSError:
+                    pass
+        self.evict(keep=name)
+
+    def load(self, name, rng=None):
+        """returns the SearchState saved as name, with its points memory mapped read only from disk
+        raises KeyError if there is no such session"""
+        folder = self._folder(name)
+        statePath = os.path.join(folder, "state.json")
+        if not os.path.exists(statePath):
+            raise KeyError("no saved session called " + repr(name))
+        with open(statePath) as stateFile:
+            state = json.load(stateFile)
+        options = {key: value for key, value in state["options"].items() if key in config.options()}
+        search = SearchState(rng, options)
+        search.sphereList = state["sphereList"]
+        search.voidSpheres = state["voidSpheres"]
+        search.removedSpheres = state["removedSpheres"]
+        search.readings = state.get("readings", search.sphereList + search.voidSpheres + search.removedSpheres)
+        search.sync_constraints()
+        search.points = np.load(os.path.join(folder, state["points"]), mmap_mode="r")
+        search.stats = _load_stats(state["stats"])
+        search.volume = state["volume"]
+        search.drawn = state["drawn"]
+        if search.options["analytic"] and search.options["edgeSigma"] == 0 and len(search.sphereList) > 0:
+            search.exact = analytic_region(search.sphereList, search.voidSpheres)
+        os.utime(statePath)
+        return search
+
+    def delete(self, name):
+        """removes the session called name, if there is one"""
+        import shutil
+        shutil.rmtree(self._folder(name), ignore_errors=True)
+
+    def sessions(self):
+        """returns [[name, last used time, bytes on disk], ...] for every saved session, most recently used first"""
+        found = []
+        for name in os.listdir(self.root):
+            statePath = os.path.join(self.root, name, "state.json")
+            if os.path.exists(statePath):
+                size = sum(entry.stat().st_size for entry in os.scandir(os.path.join(self.root, name)) if entry.is_file())
+                found.append([name, os.path.getmtime(statePath), size])
+        return sorted(found, key=lambda session: session[1], reverse=True)
+
+    def evict(self, keep=None):
+        """deletes the least recently used sessions until there are at most maxSessions using at most maxBytes
+        the session called keep is never deleted
+        returns the names of the deleted sessions"""
+        sessions = self.sessions()
+        total = sum(session[2] for session in sessions)
+        deleted = []
+        for [name, used, size] in reversed(sessions):
+            if len(sessions) - len(deleted) <= self.maxSessions and total <= self.maxBytes:
+                break
+            if name == keep:
+                continue
+            self.delete(name)
+            deleted.append(name)
+            total -= size
+        return deleted
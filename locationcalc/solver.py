@@ -0,0 +1,442 @@
+import time
+import numpy as np
+
+from . import config
+from .analytic import analytic_region
+from .constraints import ConstraintEngine, get_best_overlap, prune_constraints, update_list
+from .constraintset import ConstraintSet
+from .geometry import box_volume, intersection_box, sphere_volume
+from .likelihood import effective_samples, likelihood_summary, log_likelihood, widen
+from .octree import octree_region, octree_sampler
+from .pairs import PairIndex
+from .pool import shared_pool
+from .profiling import timed_stage
+from .regions import find_regions
+from .sampling import box_scatter, lens_scatter, lens_volume, sphere_scatter
+from .stats import RunningStats, scatter_summary
+from .stream import stream_scatter
+
+def _sampler(function, volume):
+    #tags a sampler(n, rng) with the volume of the region it covers
+    function.volume = volume
+    return function
+
+@timed_stage("domain")
+def sampling_domain(spheres, pairIndex=None, pool=None, qmc=False, constraints=None):
+    """picks the region points are generated in for a sphere list
+    uses whichever has the least volume out of the lens of the best overlapping pair and the smallest sphere,
+    keeping only points inside the bounding box of the intersection of every sphere (or the box alone when that is smaller)
+    returns [bestOverlap, bestSphere, sampler]
+    where sampler(n, rng) draws n points inside the chosen region and returns them (array shape (m, 3)), leaving out
+    any outside the bounding box, so m can be less than n but n is always the number of samples drawn
+    and sampler.volume is the volume of the region the n points are drawn in
+    if the spheres cannot all overlap the sampler always returns no points
+    pairIndex is an optional PairIndex kept up to date with spheres, so the best pair is not searched for again
+    pool is an optional pool.SamplePool used when points are generated in a sphere
+    qmc generates the points from randomised Halton sequences, see sampling.sphere_scatter
+    constraints is an optional ConstraintSet holding spheres, its cached volumes and box are used instead of working them out again"""
+    bestSphere = []
+    bestOverlap = []
+    if len(spheres) > 1:
+        bestOverlap = get_best_overlap(spheres, pairIndex)
+        #determine sphere with smallest volume
+        if constraints is not None:
+            bestSphere = constraints.smallest()
+        else:
+            for sphere in spheres:
+                vol = sphere_volume(sphere)
+                if len(bestSphere) == 0 or bestSphere[1] > vol:
+                    bestSphere = [sphere, vol]
+    else:
+        bestSphere = [spheres[0], sphere_volume(spheres[0])]
+    sphere = bestSphere[0]
+    domains = [_sampler(lambda n, rng=None: sphere_scatter(sphere, n, rng, pool, qmc), bestSphere[1])]
+
+    #lens of the best overlapping pair
+    #should help to handle the case of very thin spheres more effectively
+    if len(bestOverlap) != 0:
+        [sphereOne, sphereTwo] = bestOverlap[0]
+        domains.append(_sampler(lambda n, rng=None: lens_scatter(sphereOne, sphereTwo, n, rng, qmc), lens_volume(sphereOne, sphereTwo)))
+
+    #box around the intersection of every sphere, gets tighter as more spheres are added
+    #points from the sphere or lens are only kept when they also fall in the box
+    sampler = min(domains, key=lambda domain: domain.volume)
+    if len(spheres) > 1:
+        box = intersection_box(spheres) if constraints is None else constraints.box
+        if box is None:
+            return [bestOverlap, bestSphere, _sampler(lambda n, rng=None: np.empty((0, 3)), 0)]
+        if box_volume(box) < sampler.volume:
+            sampler = _sampler(lambda n, rng=None: box_scatter(box, n, rng, qmc), box_volume(box))
+        else:
+            sampler = _box_restricted(sampler, box)
+    return [bestOverlap, bestSphere, sampler]
+
+def _box_restricted(sampler, box):
+    #wraps a sampler so it only returns the points inside box, a cheap test that saves checking the others against every sphere
+    #each call draws exactly n points from the wrapped sampler, so n is still the number of samples drawn and the volume
+    #stays that of the wrapped sampler's region (points outside the box are counted as drawn but not valid)
+    def restricted(n, rng=None):
+        points = sampler(n, rng)
+        return points[((points >= box[0]) & (points <= box[1])).all(axis=1)]
+    return _sampler(restricted, sampler.volume)
+
+def _replicate_error(batches):
+    #standard error of the pooled center from the [count, sum] of independent batches (ratio estimator)
+    counts = np.array([batch[0] for batch in batches], dtype=float)
+    sums = np.array([batch[1] for batch in batches])
+    if (counts == 0).any():
+        return np.full(3, np.inf)
+    means = sums / counts[:, np.newaxis]
+    mean = sums.sum(axis=0) / counts.sum()
+    k = len(batches)
+    return np.sqrt((counts[:, np.newaxis]**2 * (means - mean)**2).sum(axis=0) / (k * (k - 1))) / counts.mean()
+
+def adaptive_scatter(engine, sampler, rng=None, tolerance=None, maxSamples=None, maxTime=None, batchSamples=None, stats=None, minPoints=None, keepPoints=None, replicates=None):
+    """draws samples in batches until the center of the valid points is known to within tolerance
+    engine is a ConstraintEngine, sampler(n, rng) generates n candidate points
+    stops when the standard error of the center is at most tolerance on every axis (once minPoints are found),
+    or when maxSamples points have been drawn, or after maxTime seconds
+    the standard error assumes independent points, which overstates it for evenly spread (qmc) points. with replicates
+    set, each batch is split into that many chunks (each one a separately randomised set from the sampler) and the standard
+    error comes from how much the centers of the chunks drawn in this call differ, checked once there are replicates of them
+    stats can be a RunningStats of points already kept, new points are added on top of it
+    at most keepPoints of the new valid points are kept (a uniform sample of them), stats covers all of them
+    settings that are not given come from config
+    returns [validPoints, stats, drawn] where validPoints are only the newly drawn valid points
+    and stats is a RunningStats of all valid points"""
+    tolerance = config.adaptiveTolerance if tolerance is None else tolerance
+    maxSamples = config.adaptiveMaxSamples if maxSamples is None else maxSamples
+    maxTime = config.adaptiveMaxTime if maxTime is None else maxTime
+    batchSamples = config.adaptiveBatch if batchSamples is None else batchSamples
+    minPoints = config.minAdaptivePoints if minPoints is None else minPoints
+    start = time.perf_counter()
+    stats = RunningStats() if stats is None else stats
+    #[count, sum] of every chunk, worked out from the change in the running totals
+    batches = []
+    previous = [stats.count, stats.mean * stats.count]
+    def settled(stats, drawn):
+        if replicates is not None:
+            total = stats.mean * stats.count
+            batches.append([stats.count - previous[0], total - previous[1]])
+            previous[:] = [stats.count, total]
+            error = _replicate_error(batches) if len(batches) >= max(replicates, 2) else np.full(3, np.inf)
+        else:
+            error = stats.standard_error()
+        #need a handful of points before the standard error means anything
+        if stats.count >= minPoints and error.max() <= tolerance:
+            return True
+        return time.perf_counter() - start > maxTime
+    chunkSamples = batchSamples if replicates is None else max(batchSamples // replicates, 1)
+    return stream_scatter(engine, sampler, maxSamples, rng, chunkSamples, keepPoints, stats, settled)
+
+def draw_points(engine, sampler, rng=None, stats=None, options=None):
+    """generates valid points from sampler, in adaptive batches when adaptive is set, otherwise as a stream of samples points
+    engine is a ConstraintEngine, stats an optional RunningStats the new points are added to
+    options = {name: value} overrides the settings in config
+    returns [validPoints, stats, drawn], validPoints holds at most maxKeptPoints of the new valid points"""
+    options = config.options(options)
+    if options["adaptive"]:
+        return adaptive_scatter(engine, sampler, rng, options["adaptiveTolerance"], options["adaptiveMaxSamples"], options["adaptiveMaxTime"],
+                                options["adaptiveBatch"], stats, options["minAdaptivePoints"], options["maxKeptPoints"],
+                                options["qmcReplicates"] if options["qmc"] else None)
+    return stream_scatter(engine, sampler, options["samples"], rng, options["streamChunk"], options["maxKeptPoints"], stats)
+
+def sphere_intersection(spheres, voidSpheres, rng=None, options=None):
+    """generates points within the intersection of spheres that are outside all voidSpheres
+    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ]
+    samples are drawn in batches until the center settles when adaptive is set, otherwise a fixed number of samples is drawn
+    points are generated inside the octree cells of the region when solverEngine is "octree", or when sampling finds nothing
+    prints the center and bounds of the valid points
+    returns [bestOverlap, bestSphere, scatterSamples]"""
+    options = config.options(options)
+    [bestOverlap, bestSphere, sampler] = sampling_domain(spheres)
+    engine = ConstraintEngine(spheres, voidSpheres)
+    scatterSamples = np.empty((0, 3))
+    if options["solverEngine"] != "octree" and sampler.volume > 0:
+        [scatterSamples, stats, drawn] = draw_points(engine, sampler, rng, options=options)
+    if len(scatterSamples) == 0 and sampler.volume > 0:
+        region = octree_region(spheres, voidSpheres, maxDepth=options["octreeDepth"], maxCells=options["octreeMaxCells"])
+        [scatterSamples, stats, drawn] = draw_points(engine, octree_sampler(region), rng, options=options)
+    if len(scatterSamples) > 0:
+        report_scatter(scatterSamples, stats if options["adaptive"] else None, options["minRegionMass"])
+
+    return [bestOverlap, bestSphere, scatterSamples]
+
+def report_scatter(scatterSamples, stats=None, minRegionMass=None):
+    """prints the center and bounds of a set of valid points, plus the standard error of the center if stats (RunningStats) is given
+    also prints the 5-95% bounds and the direction the points are most spread along (where the next reading helps most),
+    and lists each separate region holding at least minRegionMass of the points when there is more than one"""
+    minRegionMass = config.minRegionMass if minRegionMass is None else minRegionMass
+    summary = scatter_summary(scatterSamples, stats)
+    [low, high] = [np.floor(summary["low"]).astype(int).tolist(), np.ceil(summary["high"]).astype(int).tolist()]
+    print("Center of scatter: ", np.array(summary["mean"]).astype(int).tolist())
+    print({"x": [low[0], high[0]], "y": [low[1], high[1]], "z": [low[2], high[2]]})
+    print("90% of points between ", np.round(summary["percentileLow"]).astype(int).tolist(), " and ", np.round(summary["percentileHigh"]).astype(int).tolist())
+    print("widest along ", np.round(summary["axes"][0], 2).tolist(), ", 95% ellipsoid half widths: ", np.round(summary["ellipsoid"]).astype(int).tolist())
+    if stats is not None:
+        print("standard error of center: ", np.round(stats.standard_error(), 2).tolist(), " from ", stats.count, " points")
+    #the center above can sit in empty space when the valid points are split into separate areas
+    regions = [region for region in find_regions(scatterSamples) if region["mass"] >= minRegionMass]
+    if len(regions) > 1:
+        print(len(regions), " separate regions found:")
+        for region in regions:
+            print(round(100 * region["mass"], 1), "% of points, center: ", [int(x) for x in region["center"]],
+                  " bounds: ", np.round(region["box"]).astype(int).tolist())
+
+class SearchState:
+    """keeps the sphere lists and the cloud of valid points for one search between inputs
+
+    adding a sphere can only shrink the valid region, so the points already kept are still a uniform sample of the new
+    region once the ones outside the new sphere are dropped. each new sphere therefore only tests the kept points against
+    itself, and new points are only generated (against every sphere) when too few survive or the center is not settled
+
+    with edgeSigma set the sphere lists hold every reading widened by edgeWidth * edgeSigma (see likelihood.py), the kept
+    points are uniform over that wider region and are weighted by the likelihood of the readings (kept in readings) when
+    the result is worked out
+
+    options = {name: value} overrides the settings in config for this search"""
+    def __init__(self, rng=None, options=None):
+        self.options = config.options(options)
+        self.sphereList = []
+        self.voidSpheres = []
+        self.removedSpheres = []
+        self.readings = []
+        self.pairIndex = PairIndex()
+        self.constraints = ConstraintSet()
+        self.pool = None
+        if self.options["samplePool"]:
+            self.pool = shared_pool(self.options["samplePoolSize"], self.options["samplePoolBlocks"], self.options["samplePoolSequence"])
+        self.points = np.empty((0, 3))
+        self.stats = RunningStats()
+        self.region = None
+        self.exact = None
+        self.volume = 0
+        self.drawn = 0
+        self.rng = np.random.default_rng(self.options["seed"]) if rng is None else rng
+
+    def add_sphere(self, newSphere):
+        """sorts newSphere into the sphere lists and updates the kept points
+        newSphere = [x, y, z, r1, r2]
+        returns the number of new samples drawn"""
+        return self.add_spheres([newSphere])
+
+    def add_spheres(self, newSpheres):
+        """sorts several new spheres into the sphere lists and updates the kept points once for all of them
+        newSpheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ], r2 can be left out for solid spheres
+        returns the number of new samples drawn"""
+        newSpheres = [list(sphere) + [0] * (len(sphere) == 4) for sphere in newSpheres]
+        for newSphere in newSpheres:
+            if len(newSphere) != 5:
+                raise ValueError("spheres need 4 or 5 numbers [x, y, z, r1, r2], got " + str(newSphere))
+        self.readings.extend(newSpheres)
+        if self.options["edgeSigma"] > 0:
+            newSpheres = widen(newSpheres, self.options["edgeWidth"] * self.options["edgeSigma"])
+        sphereRemovals = self.constraints.sphereRemovals
+        for newSphere in newSpheres:
+            [self.sphereList, self.voidSpheres, self.removedSpheres] = update_list(self.sphereList, self.voidSpheres, self.removedSpheres, newSphere, self.constraints)
+        [self.sphereList, self.voidSpheres, self.removedSpheres, box] = prune_constraints(self.sphereList, self.voidSpheres, self.removedSpheres, self.constraints)
+        #spheres dropped from the list mean the pair index has to start over
+        if self.constraints.sphereRemovals != sphereRemovals:
+            self.pairIndex = PairIndex()
+        for sphere in self.sphereList[len(self.pairIndex):]:
+            self.pairIndex.add(sphere)
+        self.region = None
+        self.exact = None
+        if box is None and len(self.sphereList) > 0:
+            #no point can satisfy every sphere, nothing to sample
+            self.points = np.empty((0, 3))
+            self.stats = RunningStats()
+            self.volume = 0
+            return 0
+        if len(self.points) > 0:
+            before = len(self.points)
+            self.points = ConstraintEngine([sphere for sphere in newSpheres if sphere[3] > sphere[4]],
+                                           [sphere for sphere in newSpheres if sphere[3] <= sphere[4]]).filter(self.points)
+            self.volume *= len(self.points) / before
+            self.stats = RunningStats()
+            self.stats.update(self.points)
+        if len(self.sphereList) == 0:
+            return 0
+        #one or two spheres have an exact answer, points are only generated for them when asked for (top_up)
+        #(soft edges have no closed form)
+        if self.options["analytic"] and self.options["edgeSigma"] == 0:
+            self.exact = analytic_region(self.sphereList, self.voidSpheres)
+            if self.exact is not None:
+                return 0
+        drawn = 0
+        if self.stats.count < self.options["minSurvivors"] or (self.options["adaptive"] and self.stats.standard_error().max() > self.options["adaptiveTolerance"]):
+            drawn = self.top_up()
+        if self.options["edgeSigma"] > 0:
+            #weights spread unevenly over the points, keep adding points until enough of them count
+            #(adaptiveMaxSamples limits the samples drawn for these spheres, not over the whole search)
+            while (len(self.points) > 0 and self.effective_samples() < self.options["minEffectiveSamples"]
+                   and len(self.points) < self.options["maxKeptPoints"] and drawn < self.options["adaptiveMaxSamples"]):
+                added = self.top_up()
+                if added == 0:
+                    break
+                drawn += added
+        return drawn
+
+    def log_weights(self):
+        """returns the log likelihood of each kept point given the readings, see likelihood.log_likelihood (0 for every
+        point when edgeSigma is not set)"""
+        if self.options["edgeSigma"] == 0:
+            return np.zeros(len(self.points))
+        return log_likelihood(self.points, self.readings, self.options["edgeSigma"])
+
+    def effective_samples(self):
+        """returns the effective number of kept points once they are weighted, see likelihood.effective_samples"""
+        logWeights = self.log_weights()
+        return effective_samples(np.exp(logWeights - logWeights.max())) if len(logWeights) > 0 else 0.
+
+    def sync_constraints(self):
+        """rebuilds the ConstraintSet and PairIndex from the sphere lists, after the lists were replaced (see SessionStore.load)
+        add_spheres keeps both up to date itself"""
+        self.constraints = ConstraintSet(self.sphereList, self.voidSpheres)
+        self.pairIndex = PairIndex(self.sphereList)
+
+    def top_up(self):
+        """generates new points in the current valid region and adds them to the kept points
+        falls back to generating points in the octree cells of the region if sampling finds nothing
+        returns the number of new samples drawn"""
+        [bestOverlap, bestSphere, sampler] = sampling_domain(self.sphereList, self.pairIndex, self.pool, self.options["qmc"], self.constraints)
+        engine = self.constraints.engine()
+        newPoints = np.empty((0, 3))
+        drawn = 0
+        self.region = None
+        #a sampler with no volume means the spheres cannot all overlap
+        if sampler.volume == 0:
+            return 0
+        countBefore = self.stats.count
+        if self.options["solverEngine"] != "octree":
+            [newPoints, self.stats, drawn] = draw_points(engine, sampler, self.rng, self.stats, self.options)
+        if self.options["solverEngine"] == "octree" or self.stats.count == 0:
+            self.drawn += drawn
+            self.region = octree_region(self.sphereList, self.voidSpheres, maxDepth=self.options["octreeDepth"], maxCells=self.options["octreeMaxCells"])
+            sampler = _sampler(octree_sampler(self.region), self.region["volumeRange"][1])
+            if sampler.volume == 0:
+                return drawn
+            [newPoints, self.stats, drawn] = draw_points(engine, sampler, self.rng, self.stats, self.options)
+        #share of the sampled region the new valid points were found in (counted in stats, not all of them are kept)
+        if drawn > 0:
+            self.volume = sampler.volume * (self.stats.count - countBefore) / drawn
+        self.drawn += drawn
+        self.points = np.concatenate([self.points, newPoints])
+        #kept and new points are both uniform in the current region, so thinning them at random keeps them uniform
+        if len(self.points) > self.options["maxKeptPoints"]:
+            self.points = self.points[self.rng.choice(len(self.points), self.options["maxKeptPoints"], replace=False)]
+        return drawn
+
+    def result(self):
+        """returns a summary of the search so far as plain python values, see summarise and exact_summary"""
+        if self.exact is not None:
+            return exact_summary(self.exact)
+        if self.options["edgeSigma"] > 0:
+            return likelihood_summary(self.points, self.log_weights(), self.volume, self.drawn, self.options["credibility"], self.options["minRegionMass"])
+        return summarise(self.points, self.stats, self.volume, self.drawn, self.options["minRegionMass"])
+
+    def report(self):
+        """prints the center and bounds of the kept points, and the octree volume if one was built
+        or the exact center, bounds and volume when the region has a closed form"""
+        if self.exact is not None:
+            if self.exact["volume"] > 0:
+                print("Center (exact): ", np.round(self.exact["center"], 2).tolist())
+                print("bounds: ", np.round(self.exact["box"]).astype(int).tolist(), " volume: ", round(self.exact["volume"]))
+            else:
+                print("no valid solution found")
+        elif self.options["edgeSigma"] > 0 and len(self.points) > 0:
+            result = self.result()
+            print("Center (likelihood weighted): ", np.round(result["center"]).astype(int).tolist(), " most likely point: ", np.round(result["map"]).astype(int).tolist())
+            print(round(100 * self.options["credibility"]), "% credible region between ", np.floor(result["credibleBox"][0]).astype(int).tolist(),
+                  " and ", np.ceil(result["credibleBox"][1]).astype(int).tolist(), " volume: ", round(result["credibleVolume"]))
+            print("standard error of center: ", np.round(result["standardError"], 2).tolist(), " from ", round(result["effectiveSamples"]), " effective points")
+            if result["effectiveSamples"] < self.options["minEffectiveSamples"]:
+                print("fewer effective points than minEffectiveSamples (", self.options["minEffectiveSamples"], "), the sample limit was reached first")
+            if len(result["regions"]) > 1:
+                print(len(result["regions"]), " separate regions found")
+        elif len(self.points) > 0:
+            report_scatter(self.points, self.stats if self.options["adaptive"] else None, self.options["minRegionMass"])
+        else:
+            print("no valid solution found")
+        if self.exact is None and len(self.sphereList) > 1 and self.pairIndex.best is None:
+            print("no overlapping pair of spheres, points were generated in the smallest sphere")
+        if self.region is not None and self.region["volume"] > 0:
+            print("volume: ", round(self.region["volume"]), " (between ", round(self.region["volumeRange"][0]), " and ", round(self.region["volumeRange"][1]), ")")
+
+def summarise(points, stats, volume, drawn, minRegionMass=None):
+    """summarises a set of valid points as plain python values
+    stats is a RunningStats of the points, volume the estimated volume of the valid region and drawn the samples it took
+    returns {"feasible": bool, "center": [x, y, z], "standardError": [x, y, z], "box": [[xmin, ymin, zmin], [xmax, ymax, zmax]],
+             "percentileBox": [[x5, y5, z5], [x95, y95, z95]], "axes": 3x3, "ellipsoid": [r1, r2, r3],
+             "volume": v, "count": valid points, "drawn": samples drawn, "regions": [region, ...], "exact": False}
+    center, box and count come from stats, so they cover every valid point even when only a sample of them is in points
+    axes and ellipsoid are the principal axes of the points (widest first) and the half widths of the 95% ellipsoid along them,
+    see stats.scatter_summary
+    center, standardError, box, percentileBox, axes and ellipsoid are None when there are no valid points,
+    regions are as returned by find_regions, leaving out regions with less than minRegionMass of the points"""
+    minRegionMass = config.minRegionMass if minRegionMass is None else minRegionMass
+    feasible = len(points) > 0
+    regions = []
+    summary = None
+    if feasible:
+        regions = [region for region in find_regions(points, totalVolume=volume) if region["mass"] >= minRegionMass]
+        summary = scatter_summary(points, stats)
+    return {"feasible": feasible,
+            "center": stats.mean.tolist() if feasible else None,
+            "standardError": stats.standard_error().tolist() if feasible else None,
+            "box": [stats.low.tolist(), stats.high.tolist()] if feasible else None,
+            "percentileBox": [summary["percentileLow"], summary["percentileHigh"]] if feasible else None,
+            "axes": summary["axes"] if feasible else None,
+            "ellipsoid": summary["ellipsoid"] if feasible else None,
+            "volume": float(volume),
+            "count": int(stats.count),
+            "drawn": int(drawn),
+            "regions": regions,
+            "exact": False}
+
+def exact_summary(region):
+    """summary in the same form as summarise for a region from analytic.analytic_region, with "exact": True
+    standardError is 0, count and drawn are 0 since no points were generated, and the region is listed as the only one
+    percentileBox, axes and ellipsoid need points and are None"""
+    feasible = region["volume"] > 0
+    center = region["center"].tolist() if feasible else None
+    box = region["box"].tolist() if feasible else None
+    return {"feasible": feasible,
+            "center": center,
+            "standardError": [0., 0., 0.] if feasible else None,
+            "box": box,
+            "percentileBox": None,
+            "axes": None,
+            "ellipsoid": None,
+            "volume": float(region["volume"]),
+            "count": 0,
+            "drawn": 0,
+            "regions": [{"center": center, "box": box, "volume": float(region["volume"]), "count": 0, "mass": 1.0}] if feasible else [],
+            "exact": True}
+
+def solve(spheres, voidSpheres=(), options=None):
+    """finds the valid region for a sphere list without any user input or printing
+    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ], void spheres can be given here or in voidSpheres
+    options = {name: value} overrides the settings in config, e.g. {"seed": 1, "adaptiveTolerance": 0.1}
+    with workers above 1 the samples budget is split over that many processes instead, see parallel.parallel_solve
+    (not with edgeSigma set, weighted searches always run here)
+    returns the summary dict described in summarise, or likelihood.likelihood_summary with edgeSigma set"""
+    settings = config.options(options)
+    if settings["workers"] > 1 and settings["edgeSigma"] == 0:
+        from .parallel import parallel_solve
+        return parallel_solve(spheres, voidSpheres, options)
+    search = SearchState(options=options)
+    search.add_spheres(list(spheres) + list(voidSpheres))
+    return search.result()
+
+def solve_problem(problem, options=None):
+    """solves one problem dict {"id": ..., "spheres": [...], "voidSpheres": [...], "options": {...}}
+    voidSpheres and options are optional, options are applied under the problem's own options
+    returns the result of solve with the problem id added, or {"id": ..., "error": message} if it could not be solved"""
+    try:
+        problemOptions = dict(options or {})
+        problemOptions.update(problem.get("options", {}))
+        result = solve(problem["spheres"], problem.get("voidSpheres", []), problemOptions)
+    except Exception as error:
+        return {"id": problem.get("id"), "error": str(error)}
+    return {"id": problem.get("id"), **result}
@@ -0,0 +1,142 @@
+import math
+import numpy as np
+
+class RunningStats:
+    """running count, mean, covariance and bounds (low, high) of batches of 3D points
+    batches are merged with the pairwise update so nothing but the totals is kept"""
+    def __init__(self):
+        self.count = 0
+        self.mean = np.zeros(3)
+        self.scatter = np.zeros((3, 3))
+        self.low = np.full(3, np.inf)
+        self.high = np.full(3, -np.inf)
+
+    def update(self, points):
+        """adds a batch of points (array shape (n, 3)) to the totals"""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        n = len(points)
+        if n == 0:
+            return
+        #one contiguous row per axis, reductions along rows are several times faster than down the columns of points
+        columns = points.T.copy()
+        batch = RunningStats()
+        batch.count = n
+        batch.mean = columns.sum(axis=1) / n
+        columns -= batch.mean[:, np.newaxis]
+        batch.scatter = columns @ columns.T
+        batch.low = columns.min(axis=1) + batch.mean
+        batch.high = columns.max(axis=1) + batch.mean
+        self.merge(batch)
+
+    def merge(self, other):
+        """adds the totals of another RunningStats to this one"""
+        if other.count == 0:
+            return
+        delta = other.mean - self.mean
+        total = self.count + other.count
+        self.scatter += other.scatter + np.outer(delta, delta) * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.low = np.minimum(self.low, other.low)
+        self.high = np.maximum(self.high, other.high)
+
+    def covariance(self):
+        """returns the 3x3 sample covariance of the points seen so far"""
+        if self.count < 2:
+            return np.zeros((3, 3))
+        return self.scatter / (self.count - 1)
+
+    def standard_error(self):
+        """returns the standard error of the mean on each axis [x, y, z]"""
+        if self.count < 2:
+            return np.full(3, np.inf)
+        return np.sqrt(np.diag(self.covariance()) / self.count)
+
+class Reservoir:
+    """keeps a uniform random sample of at most size points out of a stream of batches of 3D points
+    (reservoir sampling: the k-th point seen replaces a random kept point with chance size / k)
+    rng is an optional numpy.random.Generator, a fresh one is used if not given"""
+    def __init__(self, size, rng=None):
+        self.size = size
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.kept = np.empty((0, 3))
+        self.seen = 0
+
+    def update(self, points):
+        """offers a batch of points (array shape (n, 3)) to the sample"""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        fill = min(len(points), self.size - len(self.kept))
+        if fill > 0:
+            self.kept = np.concatenate([self.kept, points[:fill]])
+        rest = points[fill:]
+        if len(rest) > 0:
+            #position of each point in the stream, a point is kept if its random slot lands inside the reservoir
+            #(when two points get the same slot the later one wins, same as taking them one at a time)
+            slots = self.rng.integers(0, self.seen + fill + np.arange(1, len(rest) + 1))
+            keep = slots < self.size
+            self.kept[slots[keep]] = rest[keep]
+        self.seen += len(points)
+
+    def points(self):
+        """returns the kept points, array shape (n, 3)"""
+        return self.kept
+
+def scatter_center(scatterSamples):
+    """determines the average coordinates of a set of 3D points
+    scatterSamples = [[x, y, z], [x, y, z],  ... ] or an array shape (n, 3)
+    returns [xavg, yavg, zavg] as integers"""
+    return np.asarray(scatterSamples, dtype=float).reshape(-1, 3).mean(axis=0).astype(int).tolist()
+
+def find_scatter_bounds(scatterPoints, center=None):
+    """Finds the max and min (x, y, z) for the scatter, rounded outwards to integers
+    center is no longer needed and only kept so older calls still work
+    returns {"x": [xmin, xmax], "y": [ymin, ymax], "z": [zmin, zmax]}"""
+    scatterPoints = np.asarray(scatterPoints, dtype=float).reshape(-1, 3)
+    low = np.floor(scatterPoints.min(axis=0)).astype(int).tolist()
+    high = np.ceil(scatterPoints.max(axis=0)).astype(int).tolist()
+    return {"x": [low[0], high[0]], "y": [low[1], high[1]], "z": [low[2], high[2]]}
+
+def chi2_quantile(probability, degrees=3):
+    """approximate quantile of the chi-square distribution (Wilson-Hilferty), within about 1% for 3 degrees of freedom"""
+    import statistics
+    z = statistics.NormalDist().inv_cdf(probability)
+    return degrees * (1 - 2/(9*degrees) + z*math.sqrt(2/(9*degrees)))**3
+
+def scatter_summary(points, stats=None, percentiles=(5, 95), confidence=0.95, percentileSamples=200000):
+    """summarises a set of 3D points (array shape (n, 3)) with array operations only
+    stats is an optional RunningStats of the points, its totals are used for mean, covariance and bounds
+    (useful when points are only a sample of every valid point)
+    returns {"count": n, "mean": [x, y, z], "covariance": 3x3, "standardError": [x, y, z],
+             "low": [xmin, ymin, zmin], "high": [xmax, ymax, zmax],
+             "percentileLow": [x, y, z], "percentileHigh": [x, y, z],
+             "axes": 3x3, "spread": [s1, s2, s3], "ellipsoid": [r1, r2, r3]}
+    axes are the principal axes of the points (one per row, widest first) and spread the standard deviation along each,
+    ellipsoid holds the semi-axis lengths along axes of the ellipsoid expected to hold confidence of the points
+    (for a gaussian cloud), the first row of axes is the direction that most needs narrowing"""
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    if stats is None:
+        stats = RunningStats()
+        stats.update(points)
+    covariance = stats.covariance()
+    #eigh sorts smallest first
+    [variances, vectors] = np.linalg.eigh(covariance)
+    order = np.argsort(variances)[::-1]
+    spread = np.sqrt(np.maximum(variances[order], 0))
+    #percentiles from at most percentileSamples evenly strided points (the points are in random order, so this is a random
+    #subsample), both ranks found with one partial sort per axis
+    subset = points[::max(1, len(points) // percentileSamples)].T.copy()
+    if subset.shape[1] == 0:
+        subset = np.full((3, 1), np.nan)
+    ranks = [int(round(p / 100 * (subset.shape[1] - 1))) for p in percentiles]
+    partitioned = np.partition(subset, ranks, axis=1)
+    return {"count": int(stats.count),
+            "mean": stats.mean.tolist(),
+            "covariance": covariance.tolist(),
+            "standardError": stats.standard_error().tolist(),
+            "low": stats.low.tolist(),
+            "high": stats.high.tolist(),
+            "percentileLow": partitioned[:, ranks[0]].tolist(),
+            "percentileHigh": partitioned[:, ranks[1]].tolist(),
+            "axes": vectors[:, order].T.tolist(),
+            "spread": spread.tolist(),
+            "ellipsoid": (spread * math.sqrt(chi2_quantile(confidence))).tolist()}
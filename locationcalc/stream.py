@@ -0,0 +1,60 @@
+import numpy as np
+
+from . import config
+from .profiling import count, stage
+from .stats import Reservoir, RunningStats
+
+def sample_chunks(sampler, rng, chunkSamples, samples=None):
+    """generates candidate points from sampler(n, rng) chunkSamples at a time, until samples have been drawn
+    (or forever if samples is None)
+    yields [points, drawn] where drawn is the number of samples the chunk took"""
+    drawn = 0
+    while samples is None or drawn < samples:
+        n = chunkSamples if samples is None else min(chunkSamples, samples - drawn)
+        drawn += n
+        with stage("sampling"):
+            points = sampler(n, rng)
+        count("generated", n)
+        yield [points, n]
+
+def valid_chunks(engine, chunks):
+    """keeps only the points of each [points, drawn] chunk that satisfy engine (a ConstraintEngine)
+    yields [validPoints, drawn]"""
+    for points, drawn in chunks:
+        with stage("filtering"):
+            points = engine.filter(points)
+        count("accepted", len(points))
+        yield [points, drawn]
+
+def reduce_chunks(chunks, stats, reservoir, stop=None):
+    """adds every [validPoints, drawn] chunk to stats (RunningStats) and reservoir (Reservoir), nothing else is kept
+    stop(stats, drawn) is checked after each chunk and ends the stream early when it returns True
+    returns the number of samples drawn"""
+    drawn = 0
+    for points, n in chunks:
+        drawn += n
+        if len(points) > 0:
+            with stage("reduction"):
+                stats.update(points)
+                reservoir.update(points)
+        if stop is not None and stop(stats, drawn):
+            break
+    return drawn
+
+def stream_scatter(engine, sampler, samples, rng=None, chunkSamples=None, keepPoints=None, stats=None, stop=None):
+    """generates, filters and reduces samples points one chunk at a time so memory does not grow with samples
+    engine is a ConstraintEngine, sampler(n, rng) generates n candidate points
+    the center, covariance and bounds of every valid point are kept in stats (new points are added on top of a given
+    RunningStats), while only a uniform sample of at most keepPoints valid points is kept
+    stop(stats, drawn) can end the stream early, see reduce_chunks
+    settings that are not given come from config (streamChunk, maxKeptPoints)
+    returns [keptPoints, stats, drawn]"""
+    chunkSamples = config.streamChunk if chunkSamples is None else chunkSamples
+    keepPoints = config.maxKeptPoints if keepPoints is None else keepPoints
+    if rng is None:
+        rng = np.random.default_rng()
+    if stats is None:
+        stats = RunningStats()
+    reservoir = Reservoir(keepPoints, rng)
+    drawn = reduce_chunks(valid_chunks(engine, sample_chunks(sampler, rng, chunkSamples, samples)), stats, reservoir, stop)
+    return [reservoir.points(), stats, drawn]
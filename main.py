@@ -1,346 +1,12 @@
-import math
-import numpy as np
-import pyperclip
 import os
-import plotly.graph_objects as go
-import sys
+import time
+
+from locationcalc import SearchState, SessionStore
 
 def_rad = 250
-samples = 200000
 maxPlotPoints = 20000
-
-### PLOTTING ###
-""" def plot_points(plotPoints):
-    fig = plt.figure()
-    ax = fig.add_subplot(projection='3d')
-    for point in plotPoints[:maxPoints]:
-        ax.scatter(xs = point[0], ys = point[1], zs = point[2], c='r', marker='o')
-    ax.set_xlabel('X')
-    ax.set_ylabel('Z')
-    ax.set_zlabel('Y')
-    ax.set_autoscale_on(True)
-    plt.show() """
-
-def plot_scatter3d(points, max_points=200_000):
-    points = np.array(points)
-    n = len(points)
-    
-    if n > max_points:
-        idx = np.random.choice(n, size=max_points, replace=False)
-        points = points[idx]
-    
-    fig = go.Figure(data=[go.Scatter3d(
-        x=points[:, 0],
-        y=points[:, 2],
-        z=points[:, 1],
-        mode='markers',
-        marker=dict(size=2, opacity=0.5)
-    )])
-    
-    fig.update_layout(
-        scene=dict(
-            xaxis_title='X',
-            yaxis_title='Z',
-            zaxis_title='Y'
-        ),
-        title=f"3D Scatter ({len(points):,} points shown)"
-    )
-    fig.update_scenes(aspectmode="data")
-    fig.show()
-
-def plot_volume(points, bins=50):
-    points = np.array(points)
-    H, edges = np.histogramdd(points, bins=bins)
-    
-    # Build voxel grid
-    x_centers = (edges[0][:-1] + edges[0][1:]) / 2
-    y_centers = (edges[1][:-1] + edges[1][1:]) / 2
-    z_centers = (edges[2][:-1] + edges[2][1:]) / 2
-    
-    X, Y, Z = np.meshgrid(x_centers, y_centers, z_centers, indexing="ij")
-    
-    fig = go.Figure(data=go.Volume(
-        x=X.flatten(),
-        y=Y.flatten(),
-        z=Z.flatten(),
-        value=H.flatten(),
-        isomin=1,          # min cutoff (ignore empty voxels)
-        isomax=H.max(),    # max density
-        opacity=0.1,       # transparency
-        surface_count=15   # number of isosurfaces
-    ))
-    
-    fig.update_layout(
-        scene=dict(
-            xaxis_title='X',
-            yaxis_title='Y',
-            zaxis_title='Z'
-        ),
-        title=f"3D Volume Rendering (bins={bins})"
-    )
-    fig.show()
-
-### 3D TOOLS ###
-def vector(pointOne, pointTwo):
-    """Calculates and returns the vector from pointOne to pointTwo"""
-    v = [pointTwo[0] - pointOne[0], pointTwo[1] - pointOne[1], pointTwo[2] - pointOne[2]]
-    return v
-
-def vector_magnitude(v):
-    """Calculates and returns the magnitude of a vector v"""
-    mag = math.sqrt(v[0]**2 + v[1]**2 + v[2]**2)
-    return mag
-
-def sphere_volume(sphere):
-    """Calculates and returns the volume of a sphere or hollow sphere
-    sphere = [x, y, z, rad1, rad2]"""
-    [rad1, rad2] = [sphere[3], sphere[4]]
-    vol = (4/3)*math.pi*(rad1**3 - rad2**3)
-    return vol
-
-def cyl_volume(d1, r):
-    """Calculates and returns the volume of a cylinder of height d1, radius r
-    returns volume"""
-    return math.pi*(r**2)*d1
-
-
-### SCATTERING TOOLS ###
-def sphere_scatter(sphere, samples):
-    """generates and returns a uniform spherical scatter in the described sphere
-    sphere = [x, y, z, outer_radius, inner_radius]
-    returns list of points [[x, y, z], [x, y, z],  ... ]"""
-    ### doesnt seem to be distributing points uniformly across radius ###
-    r1 = sphere[3]
-    r2 = sphere[4]
-    center = sphere[0:3]
-    if r2 < 0 or r1 <= r2:
-        raise ValueError("Require 0 <= r_inner < r_outer")
-    
-    #unit vectors for direction
-    v = np.random.normal(0, 1, (samples, 3))
-    v /= np.linalg.norm(v, axis = 1)[:, np.newaxis]
-
-    #random radius within r1, r2
-    u = np.random.rand(samples) 
-    rad = (u * (r1**3 - r2**3) + r2**3) ** (1/3)
-
-
-    #extend direction vectors by radius distribution, recenter samples
-    points = v * rad[:, np.newaxis]
-    points = points + center
-    return points
-
-def cyl_scatter(d1, radius, vector, center, samples):
-    """generates and returns a random cylindrical distribution
-
-    center = [x, y, z]      defines the center point of the cylinder
-    d1 defines the height of the cylinder
-    radius defines the radius of the cylinder
-    vector = [x, y, z]      defines the unit vector along which the height of the cylinder is parallel (each circle of the cylinder would lie on a plane normal to this vector)
-    
-    returns a list of points [[x, y, z], [x, y, z],  ... ]"""
-    #d1 is the distance along vector v
-    vector = np.array(vector)
-    #let vector be one coordinate axis and generate random points along this axis between -.5d1 and .5d1
-    v1 = [scale*vector for scale in np.random.uniform(-.5*d1, .5*d1, samples)]
-
-    #determine vector2 orthogonal to vector
-    if np.allclose(vector, [0,0,1]):
-        not_parallel = np.array([1,0,0])
-    else:
-        not_parallel = np.array([0,0,1])
-    vector2 = np.cross(vector, not_parallel)
-    vector2 = [i / np.linalg.norm(vector2) for i in vector2]
-
-    #determine vector3 orthogonal to both vector and vector1
-    #these 3 vectors form the basis of a new coordinate system
-    vector3 = np.cross(vector, vector2)
-
-    theta = np.random.uniform(0, 2 * np.pi, samples)
-    r = radius * np.sqrt(np.random.uniform(0, 1, samples))
-    v2 = (r * np.cos(theta))
-    v2 = [np.multiply(a, vector2) for a in  v2]
-
-    v3 = (r * np.sin(theta))
-    v3 = [np.multiply(b, vector3) for b in  v3]
-
-    circPoints = [v1[i] + v2[i] + v3[i] + center for i in range(len(v1))]
-    return circPoints
-
-def scatter_center(scatterSamples):
-    """determines the average coordinates of a set of 3D points
-    scatterSamples = [[x, y, z], [x, y, z],  ... ]
-    returns [xavg, yavg, zavg] as integers"""
-    xavg = 0
-    yavg = 0
-    zavg = 0
-
-    for point in scatterSamples:
-        xavg += point[0]
-        yavg += point[1]
-        zavg += point[2]
-    xavg = xavg/len(scatterSamples)
-    yavg = yavg/len(scatterSamples)
-    zavg = zavg/len(scatterSamples)
-    return [int(xavg), int(yavg), int(zavg)]
-
-def find_scatter_bounds(scatterPoints, center):
-    """Finds the max and min (x, y, z) for the scatter
-    returns {"x": [xmin, xmax], "y": [ymin, ymax], "z": [zmin, zmax]}"""
-    scatterPoints = (np.array(scatterPoints) - np.array(center))
-    xbounds = np.array([0, 0])
-    ybounds = np.array([0, 0])
-    zbounds = np.array([0, 0])
-    for point in scatterPoints:
-        if point[0] > xbounds[1]:
-            xbounds[1] = point[0]
-        if point[0] < xbounds[0]:
-            xbounds[0] = point[0]
-
-        if point[1] > ybounds[1]:
-            ybounds[1] = point[1]
-        if point[1] < ybounds[0]:
-            ybounds[0] = point[1]
-
-        if point[2] > zbounds[1]:
-            zbounds[1] = point[2]
-        if point[2] < zbounds[0]:
-            zbounds[0] = point[2]
-    #return {"x":xbounds.astype(int).tolist(), "y": ybounds.astype(int).tolist(), "z": zbounds.astype(int).tolist()}
-    return {"x": (xbounds + center[0]).astype(int).tolist(), "y": (ybounds + center[1]).astype(int).tolist(), "z": (zbounds + center[2]).astype(int).tolist()}
-
-### OTHER ###
-def sphere_intersection(spheres, voidSpheres):#needs doc
-    scatterSamples = None
-    #calculate vector between center of spheres
-    #consider reworking this to only check new pairs against old best when sphere added
-    bestSphere = []
-    bestOverlap = []
-    ### this should be tidied up ###
-    if len(sphereList) > 1:
-        bestOverlap = get_best_overlap(spheres)
-        #determine sphere with smallest volume
-        for sphere in spheres:
-            vol = sphere_volume(sphere)
-            try:
-                if bestSphere[1] > vol:
-                    bestSphere = [sphere, vol]
-            except:
-                bestSphere = [sphere, vol]
-        #if best sphere has less volume than best intersection use that for point generation
-        #should help to handle the case of very thin spheres more effectively
-        if len(bestOverlap) != 0:
-            #print(bestOverlap)
-            if bestSphere[1] < cyl_volume(bestOverlap[1], bestOverlap[2]):
-                scatterSamples = sphere_scatter(bestSphere[0], samples)
-            else:
-                scatterSamples = cyl_scatter(bestOverlap[1], bestOverlap[2], bestOverlap[3], bestOverlap[4], samples)
-        else:
-            scatterSamples = sphere_scatter(bestSphere[0], samples)
-    else:
-        bestSphere = [spheres[0], sphere_volume(spheres[0])]
-        scatterSamples = sphere_scatter(bestSphere[0], samples)
-    scatterSamples = valid_points(spheres, voidSpheres, scatterSamples)
-    if len(scatterSamples) > 0:
-            scatterCenter = scatter_center(scatterSamples)
-            scatterBounding = find_scatter_bounds(scatterSamples, scatterCenter)
-            print("Center of scatter: ", scatterCenter)
-            print(scatterBounding)
-
-    return [bestOverlap, bestSphere, scatterSamples]
-    
-def valid_points(spheres, voidSpheres, scatterSamples):
-    """Checks a list of 3D points against a list of spheres.
-    Points are considered valid when contained within all spheres in sphere list and not contained within the inner radius of any spheres within the list.
-
-    scatterSamples = [[x, y, z], [x, y, z],  ... ]
-    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ]
-    where r1 is outer radius of the sphere and r2 is the inner radius of the sphere
-
-    setting r2 to zero creates a non-hollow sphere
-    r2>r1 creates a 'void sphere' where contained points are invalid
-    
-    returns validPoints = [[x, y, z], [x, y, z],  ... ]"""
-    validPoints = []
-    for point in scatterSamples:
-        valid = True
-        for sphere in spheres:
-            if vector_magnitude(vector(sphere, point)) > sphere[3] or vector_magnitude(vector(sphere, point)) < sphere[4] :
-                valid = False
-        for voidSphere in voidSpheres:
-            if vector_magnitude(vector(voidSphere, point)) < voidSphere[4]:
-                valid = False
-        if valid:
-            validPoints.append(point)
-    return validPoints
-
-def update_list(spheres, voidSpheres, removedSpheres, newSphere, ):
-    """sorts newly created sphere into appropriate list
-    spheres which have outer radius less than or equal to inner radius are considered void spheres"""
-    updatedList = []
-    addNewSphere = True
-    if newSphere[3] <= newSphere[4]:
-        voidSpheres.append(newSphere)
-    else:
-        spheres.append(newSphere)
-        """ for sphere in spheres:
-            if vector_magnitude(vector(sphere, newSphere)) + newSphere[3] <= sphere[3]:
-                if sphere[3] <= newSphere[3]:
-                    updatedList.append(sphere)
-                    addNewSphere = False
-            else:
-                updatedList.append(sphere)
-        if addNewSphere == True:
-            updatedList.append(newSphere)
-        else:
-            removedSpheres.append(newSphere) """
-    return [spheres, voidSpheres, removedSpheres]
-
-def get_best_overlap(spheres):
-    """calculates and returns the pair of spheres from a sphere list which have the largest overlapping distance
-    spheres = [[x, y, z, r1, r2], [x, y, z, r1, r2],  ... ]
-    returns [[sphereOne, sphereTwo], overlap, intersectionRadius, v_u, center]
-    where sphereOne, sphereTwo are spheres = [x, y, z, r1, r2]
-    and overlap is the overlapping distance
-    if no valid overlap is found, returns []"""
-    #could implement cylinder area calculation to more accurately find the smallest overlap
-    bestOverlap = []
-    spherePairs = [(s1, s2) for s1 in spheres for s2 in spheres if s1 != s2 and vector_magnitude(vector(s1, s2)) != 0]
-    for spherePair in spherePairs:
-        overlap = spherePair[0][3] + spherePair[1][3] - vector_magnitude(vector(spherePair[0], spherePair[1]))
-        ##catch for spheres with no overlap (negative overlap distance)
-
-        #could add case for spheres with 0 overlap distance
-        #single potential solution then checked against rest of sphere list.
-        if  overlap > 0:
-            try:
-                if bestOverlap[1] > overlap:
-                    bestOverlap = [spherePair, overlap]
-            except:
-                bestOverlap = [spherePair, overlap]
-    if len(bestOverlap) != 0:
-        v_u = vector(bestOverlap[0][0], bestOverlap[0][1])
-        distance = vector_magnitude(v_u)
-        v_u = [x / distance for x in v_u]
-        distCenter = (distance**2 + bestOverlap[0][0][3]**2 - (bestOverlap[0][1][3]**2)) / (2*distance)
-        vCenter = [x * distCenter for x in v_u]
-        centerPoint = [bestOverlap[0][0][0] + vCenter[0], bestOverlap[0][0][1] + vCenter[1], bestOverlap[0][0][2] + vCenter[2]]
-        try:
-            intersectionRadius = math.sqrt(bestOverlap[0][0][3]**2 - distCenter**2)
-        except:
-            #temp while I troubleshoot a crash
-            print("Issue calculating intersection radius")
-            print("distCenter: ", distCenter)
-            print("bestOverlap[0][0][3]: ", bestOverlap[0][0][3])
-            try:
-                print("bestOverlap[0][0][3]**2 - distCenter**2: ", bestOverlap[0][0][3]**2 - distCenter**2)
-            except:
-                print("failed to calculate bestOverlap[0][0][3]**2 - distCenter**2")
-            sys.exit
-        bestOverlap.extend([intersectionRadius, v_u, centerPoint])
-    else:
-        print("no valid overlap found")
-    return bestOverlap
+#session the search is saved to after every sphere, "load autosave" resumes it after a crash or restart
+autosaveName = "autosave"
 
 def get_numbers(inputString):
     inputNumbers = []
@@ -352,13 +18,19 @@ def get_numbers(inputString):
             print(string, " not a valid number, ignoring")
     return inputNumbers
 
+def paste():
+    """returns the clipboard text
+    pyperclip is only imported here, on first use, so starting up does not wait for it"""
+    import pyperclip
+    return pyperclip.paste()
+
 def make_sphere(inputNumbers):
     ## attempting to make new sphere
     newSphere = []
     if len(inputNumbers) == 0:
         #uses default radius and gets coordinates from clipboard
         [rad1, rad2] = [def_rad, 0]
-        pastedNumbers = get_numbers(pyperclip.paste())
+        pastedNumbers = get_numbers(paste())
         if len(pastedNumbers) < 3:
             print("no valid coordinates in clipboard")
         else:
@@ -367,7 +39,7 @@ def make_sphere(inputNumbers):
     elif len(inputNumbers) == 1:
         #uses input as outer radius, gets coordinates from clipboard
         [rad1, rad2] = [inputNumbers[0], 0]
-        pastedNumbers = get_numbers(pyperclip.paste())
+        pastedNumbers = get_numbers(paste())
         if len(pastedNumbers) < 3:
             print("no valid coordinates in clipboard")
         else:
@@ -376,7 +48,7 @@ def make_sphere(inputNumbers):
     elif len(inputNumbers) == 2:
         #uses inputs as inner and outer radius, gets coordinates from clipboard
         [rad1, rad2] = [inputNumbers[0], inputNumbers[1]]
-        pastedNumbers = get_numbers(pyperclip.paste())
+        pastedNumbers = get_numbers(paste())
         if len(pastedNumbers) < 3:
             print("no valid coordinates in clipboard")
         else:
@@ -385,8 +57,8 @@ def make_sphere(inputNumbers):
     elif len(inputNumbers) == 3:
         #uses inputs as coordinates, uses default radius
         [rad1, rad2] = [def_rad, 0]
-        newSphere = inputNumbers[0:2]
-        newSphere = newSphere.extend[rad1, rad2]
+        newSphere = inputNumbers[0:3]
+        newSphere.extend([rad1, rad2])
     elif len(inputNumbers) > 3:
         #uses inputs as coordinates and radius. if only four numbers entered assumes inner radius of zero.
         newSphere = inputNumbers
@@ -394,66 +66,75 @@ def make_sphere(inputNumbers):
             newSphere.append(0)
     return newSphere
 
-while True:
-    os.system('cls')
-    sphereList = []
-    voidSpheres = []
-    removedSpheres = []
-    scatterSamples = []
-
+def main():
+    """interactive search loop, see README for the inputs"""
+    store = SessionStore()
     while True:
-        print("waiting for input: ")
-        userInput = input()
-        if userInput == "r":
-            break
-        elif userInput == "p":
-            if len(scatterSamples) != 0:
-                plot_scatter3d(scatterSamples, maxPlotPoints)
-            else:
-                #################
-                scatterSamples = sphere_scatter(sphereList[0], samples)
-                scatterSamples = valid_points(sphereList, voidSpheres, scatterSamples)
-                if len(scatterSamples) > 0:
-                    plot_scatter3d(scatterSamples, maxPlotPoints)
+        os.system('cls')
+        search = SearchState()
+
+        while True:
+            print("waiting for input: ")
+            userInput = input()
+            command = userInput.split(" ", 1)
+            if userInput == "r":
+                break
+            elif command[0] in ("save", "load") and len(command) == 2:
+                try:
+                    if command[0] == "save":
+                        store.save(command[1], search)
+                        print("saved session ", command[1])
+                    else:
+                        search = store.load(command[1])
+                        print("loaded session ", command[1], ", ", len(search.sphereList), " active spheres, ", len(search.points), " points")
+                        if len(search.sphereList) > 0:
+                            search.report()
+                except (KeyError, ValueError, OSError) as error:
+                    print(error)
+            elif userInput == "sessions":
+                for [name, used, size] in store.sessions():
+                    print(name, " last used ", time.strftime("%Y-%m-%d %H:%M", time.localtime(used)), " ", round(size / 1e6, 1), "MB")
+            elif userInput == "p":
+                #exact solutions skip sampling, generate points now to have something to plot
+                if len(search.points) == 0 and search.exact is not None:
+                    search.top_up()
+                if len(search.points) != 0:
+                    #plotly takes longer to import than the rest of the program, only load it when something is plotted
+                    from locationcalc.plotting import plot_search
+                    plot_search(search.points, search.sphereList, search.voidSpheres, maxPlotPoints)
                 else:
                     print("no valid solution found")
-        else:
-            inputNumbers = get_numbers(userInput)
-            if len(inputNumbers) > 5:
-                print("invalid input")
             else:
-                newSphere = make_sphere(inputNumbers)
-                if newSphere != None:
-                    os.system('cls')
-                    [sphereList, voidSpheres, removedSpheres] = update_list(sphereList, voidSpheres, removedSpheres, newSphere)
-                    ##displaying current stored data
-                    if len(removedSpheres) >= 1:
-                        print("inactive spheres:")
-                        for sphere in removedSpheres:
-                            print(sphere)
-                        print("\n")
-                    if len(sphereList) > 0:
-                        print("active spheres:")
-                        for sphere in sphereList:
-                            print(sphere)
-                    if len(voidSpheres) > 0:
-                        print("void spheres:")  
-                        for sphere in voidSpheres:
-                            print(sphere)
-                    print("\n")
-
-                    ##
-                    if len(sphereList) > 0 and len(sphereList) + len(voidSpheres) > 1:
-                        [cyl, sphere, scatterSamples] = sphere_intersection(sphereList, voidSpheres)
+                inputNumbers = get_numbers(userInput)
+                if len(inputNumbers) > 5:
+                    print("invalid input")
                 else:
-                    print("failed to make sphere from input.")
-
-
-            
-
-
-
-        
-
+                    newSphere = make_sphere(inputNumbers)
+                    if len(newSphere) != 0:
+                        os.system('cls')
+                        search.add_sphere(newSphere)
+                        store.save(autosaveName, search)
+                        ##displaying current stored data
+                        if len(search.removedSpheres) >= 1:
+                            print("inactive spheres:")
+                            for sphere in search.removedSpheres:
+                                print(sphere)
+                            print("\n")
+                        if len(search.sphereList) > 0:
+                            print("active spheres:")
+                            for sphere in search.sphereList:
+                                print(sphere)
+                        if len(search.voidSpheres) > 0:
+                            print("void spheres:")  
+                            for sphere in search.voidSpheres:
+                                print(sphere)
+                        print("\n")
 
+                        ##
+                        if len(search.sphereList) > 0 and len(search.sphereList) + len(search.voidSpheres) > 1:
+                            search.report()
+                    else:
+                        print("failed to make sphere from input.")
 
+if __name__ == "__main__":
+    main()